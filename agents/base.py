@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import collections.abc
 import functools
 import inspect
 from dataclasses import dataclass
@@ -29,6 +30,50 @@ class AgentResponse:
         self.metadata = dict(metadata or {})
 
 
+def _metadata_dict(metadata: Any) -> dict:
+    if not isinstance(metadata, Mapping):
+        return {"value": metadata}
+    return dict(metadata)
+
+
+@functools.singledispatch
+def _coerce_response(payload: Any) -> AgentResponse:
+    """Normalise a legacy ``handle_message`` return value into an :class:`AgentResponse`.
+
+    Dispatch is keyed on the payload type, so mixed return types cost one
+    cached registry lookup instead of an ``isinstance`` chain.
+    """
+
+    return AgentResponse(content=str(payload), metadata={})
+
+
+@_coerce_response.register(AgentResponse)
+def _(payload: AgentResponse) -> AgentResponse:
+    return payload
+
+
+@_coerce_response.register(type(None))
+def _(payload: None) -> AgentResponse:
+    return AgentResponse(content="", metadata={})
+
+
+@_coerce_response.register(tuple)
+def _(payload: tuple) -> AgentResponse:
+    if len(payload) != 2:
+        return AgentResponse(content=str(payload), metadata={})
+    content, metadata = payload
+    return AgentResponse(content=str(content), metadata=_metadata_dict(metadata))
+
+
+@_coerce_response.register(collections.abc.Mapping)
+def _(payload: Mapping) -> AgentResponse:
+    content = payload.get("content")
+    if content is None:
+        remaining = {k: v for k, v in payload.items() if k != "metadata"}
+        content = remaining or ""
+    return AgentResponse(content=str(content), metadata=_metadata_dict(payload.get("metadata", {})))
+
+
 @runtime_checkable
 class BaseAgentProtocol(Protocol):
     """Protocol describing the modern agent surface area."""
@@ -243,25 +288,7 @@ class BaseAgent(BaseAgentProtocol):
         return self._browser_tool
 
     def _coerce_agent_response(self, payload: Any) -> AgentResponse:
-        if isinstance(payload, AgentResponse):
-            return payload
-        if isinstance(payload, tuple) and len(payload) == 2:
-            content, metadata = payload
-            if not isinstance(metadata, Mapping):
-                metadata = {"value": metadata}
-            return AgentResponse(content=str(content), metadata=dict(metadata))
-        if isinstance(payload, Mapping):
-            content = payload.get("content")
-            metadata = payload.get("metadata", {})
-            if content is None:
-                remaining = {k: v for k, v in payload.items() if k != "metadata"}
-                content = remaining or ""
-            if not isinstance(metadata, Mapping):
-                metadata = {"value": metadata}
-            return AgentResponse(content=str(content), metadata=dict(metadata))
-        if payload is None:
-            return AgentResponse(content="", metadata={})
-        return AgentResponse(content=str(payload), metadata={})
+        return _coerce_response(payload)
 
     async def handle_message(
         self,
@@ -20,20 +20,12 @@ import hashlib
 import json
 import os
 import time
+from collections import OrderedDict, deque
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Mapping, Optional, Union
+from functools import partial
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
 
-import numpy as np
 from loguru import logger
-from pymilvus import (
-    Collection,
-    CollectionSchema,
-    DataType,
-    FieldSchema,
-    MilvusException,
-    connections,
-    utility,
-)
 
 from utils.openai_client import get_openai_client, OpenAIClientWrapper
 from utils.config_manager import get_config_manager
@@ -43,24 +35,81 @@ def _is_truthy_env(value: Optional[str]) -> bool:
     return str(value or "").strip().lower() in {"1", "true", "yes", "on"}
 
 
+# Read once at import (after ``utils.config_manager`` has loaded ``.env``);
+# tests flip it with :func:`set_milvus_disabled` instead of patching the environment.
+MILVUS_DISABLED: bool = _is_truthy_env(os.getenv("TEST_DISABLE_MILVUS"))
+
+
+def set_milvus_disabled(disabled: bool) -> None:
+    """Override ``TEST_DISABLE_MILVUS`` for ``SharedMemory`` instances created afterwards."""
+    global MILVUS_DISABLED
+    MILVUS_DISABLED = bool(disabled)
+
+
+# pymilvus is slow to import and unused by the in-memory backend, so these
+# names are bound into the module namespace on first real use.
+_PYMILVUS_NAMES = (
+    "Collection",
+    "CollectionSchema",
+    "DataType",
+    "FieldSchema",
+    "MilvusException",
+    "connections",
+    "utility",
+)
+
+
+def _load_pymilvus():
+    """Import pymilvus and bind the names this module uses from it."""
+    import pymilvus
+
+    globals().update({name: getattr(pymilvus, name) for name in _PYMILVUS_NAMES})
+    return pymilvus
+
+
+def _milvus_exception(message: str) -> Exception:
+    """Build a ``MilvusException`` without requiring pymilvus to be loaded yet."""
+    return _load_pymilvus().MilvusException(message)
+
+
+def __getattr__(name: str) -> Any:
+    if name in _PYMILVUS_NAMES:
+        _load_pymilvus()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 class _InMemoryVectorStore:
-    """Minimal in-memory fallback when Milvus is unavailable."""
+    """Minimal in-memory fallback when Milvus is unavailable.
+
+    Each record keeps a lower-cased search text next to it, built once at
+    write time so searches only pay for the substring test.
+    """
 
     def __init__(self, collection_names: List[str]):
-        self._collections: Dict[str, Dict[str, List[Dict[str, Any]]]] = {
+        self._collections: Dict[str, Dict[str, List[Tuple[Dict[str, Any], str]]]] = {
             name: {} for name in collection_names
         }
         self._next_id = 1
 
-    def store(self, collection: str, tenant_id: str, payload: Dict[str, Any]) -> int:
+    def store(
+        self,
+        collection: str,
+        tenant_id: str,
+        payload: Dict[str, Any],
+        search_text: str = "",
+    ) -> int:
         tenant_bucket = self._collections.setdefault(collection, {}).setdefault(tenant_id, [])
         record_id = self._next_id
         self._next_id += 1
         stored_payload = {"id": record_id, **payload}
-        tenant_bucket.append(stored_payload)
+        tenant_bucket.append((stored_payload, search_text.lower()))
         return record_id
 
     def list_records(self, collection: str, tenant_id: str) -> List[Dict[str, Any]]:
+        return [record for record, _ in self._collections.get(collection, {}).get(tenant_id, [])]
+
+    def list_searchable(self, collection: str, tenant_id: str) -> List[Tuple[Dict[str, Any], str]]:
         return list(self._collections.get(collection, {}).get(tenant_id, []))
 
     def delete_tenant(self, collection: str, tenant_id: str) -> int:
@@ -74,11 +123,21 @@ class _InMemoryVectorStore:
         return len(self._collections.get(collection, {}).get(tenant_id, []))
 
 
-@dataclass
+_SEARCH_LATENCY_WINDOW = 100
+
+# Maximum number of inputs the embeddings endpoint accepts in one request (OpenAI: 2048).
+_EMBEDDING_BATCH_LIMIT = 2048
+
+
+@dataclass(slots=True)
 class MemoryMetrics:
-    """Performance metrics for shared memory operations."""
+    """Performance metrics for shared memory operations.
+
+    Latency samples live in a ``deque`` bounded to the last
+    ``_SEARCH_LATENCY_WINDOW`` measurements, so appends evict in O(1).
+    """
     
-    search_latency: List[float] = field(default_factory=list)
+    search_latency: deque = field(default_factory=partial(deque, maxlen=_SEARCH_LATENCY_WINDOW))
     cache_hit_ratio: float = 0.0
     embedding_calls: int = 0
     storage_operations: int = 0
@@ -87,12 +146,13 @@ class MemoryMetrics:
     cache_hits: int = 0
     cache_misses: int = 0
     
+    def __post_init__(self):
+        if not isinstance(self.search_latency, deque) or self.search_latency.maxlen != _SEARCH_LATENCY_WINDOW:
+            self.search_latency = deque(self.search_latency, maxlen=_SEARCH_LATENCY_WINDOW)
+    
     def add_search_latency(self, latency: float):
-        """Add a search latency measurement."""
+        """Add a search latency measurement, dropping the oldest beyond the window."""
         self.search_latency.append(latency)
-        # Keep only last 100 measurements
-        if len(self.search_latency) > 100:
-            self.search_latency = self.search_latency[-100:]
     
     def update_cache_stats(self, hit: bool):
         """Update cache hit/miss statistics."""
@@ -122,13 +182,16 @@ class EmbeddingCache:
             Maximum number of embeddings to cache.
         """
         self.max_size = max_size
-        self._cache: Dict[str, List[float]] = {}
-        self._access_order: List[str] = []
+        # Insertion order doubles as recency order: oldest first, newest last.
+        self._cache: OrderedDict[bytes, List[float]] = OrderedDict()
     
-    def _generate_key(self, text: str, model: str) -> str:
-        """Generate cache key for text and model."""
-        content = f"{text}:{model}"
-        return hashlib.md5(content.encode()).hexdigest()
+    def _generate_key(self, text: str, model: str) -> bytes:
+        """Generate a 16-byte cache key for text and model."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(model.encode())
+        digest.update(b"\x00")
+        digest.update(text.encode())
+        return digest.digest()
     
     def get(self, text: str, model: str) -> Optional[List[float]]:
         """Get cached embedding.
@@ -146,12 +209,11 @@ class EmbeddingCache:
             Cached embedding if found.
         """
         key = self._generate_key(text, model)
-        if key in self._cache:
+        embedding = self._cache.get(key)
+        if embedding is not None:
             # Move to end (most recently used)
-            self._access_order.remove(key)
-            self._access_order.append(key)
-            return self._cache[key]
-        return None
+            self._cache.move_to_end(key)
+        return embedding
     
     def put(self, text: str, model: str, embedding: List[float]):
         """Store embedding in cache.
@@ -166,21 +228,16 @@ class EmbeddingCache:
             Embedding vector.
         """
         key = self._generate_key(text, model)
+        self._cache[key] = embedding
+        self._cache.move_to_end(key)
         
         # Remove oldest if cache is full
-        if len(self._cache) >= self.max_size and key not in self._cache:
-            oldest_key = self._access_order.pop(0)
-            del self._cache[oldest_key]
-        
-        self._cache[key] = embedding
-        if key in self._access_order:
-            self._access_order.remove(key)
-        self._access_order.append(key)
+        if len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
     
     def clear(self):
         """Clear all cached embeddings."""
         self._cache.clear()
-        self._access_order.clear()
     
     def size(self) -> int:
         """Get current cache size."""
@@ -237,7 +294,7 @@ class SharedMemory:
         self.metrics = MemoryMetrics()
 
         self.connection_alias = None
-        self._milvus_disabled = _is_truthy_env(os.getenv("TEST_DISABLE_MILVUS"))
+        self._milvus_disabled = MILVUS_DISABLED
         self._in_memory_store: Optional[_InMemoryVectorStore] = None
 
         if self._milvus_disabled:
@@ -257,6 +314,7 @@ class SharedMemory:
             )
         else:
             # Connect to Milvus and initialize collections
+            _load_pymilvus()
             self._connect_milvus()
             self._initialize_collections()
 
@@ -331,10 +389,12 @@ class SharedMemory:
         embedding: Optional[List[float]] = None,
     ) -> int:
         if not self._using_in_memory_backend():
-            raise MilvusException("In-memory backend not initialized")
+            raise _milvus_exception("In-memory backend not initialized")
         _ = embedding
         payload = self._fallback_record_payload(collection, tenant_id, content, metadata)
-        record_id = self._in_memory_store.store(collection, tenant_id, payload)
+        record_id = self._in_memory_store.store(
+            collection, tenant_id, payload, self._fallback_search_text(collection, payload)
+        )
         self.metrics.storage_operations += 1
         logger.info(
             "Stored knowledge using in-memory backend",
@@ -342,13 +402,29 @@ class SharedMemory:
         )
         return record_id
 
-    def _fallback_similarity(self, query: str, haystack: str) -> float:
-        if not query:
-            return 1.0
-        query_norm = query.strip().lower()
+    def _fallback_search_text(self, collection: str, record: Dict[str, Any]) -> str:
+        haystack_parts = []
+        if collection == self.COLLECTION_EXPERT_KNOWLEDGE:
+            haystack_parts.extend([record.get("content", ""), record.get("expert_domain", "")])
+        elif collection == self.COLLECTION_COLLABORATION_HISTORY:
+            haystack_parts.extend(
+                [
+                    record.get("interaction_id", ""),
+                    record.get("initiator_agent", ""),
+                    record.get("participating_agents", ""),
+                    record.get("task_description", ""),
+                ]
+            )
+        elif collection == self.COLLECTION_PROBLEM_SOLUTIONS:
+            haystack_parts.extend([record.get("problem", ""), record.get("solution", "")])
+        else:
+            haystack_parts.append(json.dumps(record, default=str))
+        return " ".join(str(part) for part in haystack_parts if part)
+
+    def _fallback_similarity(self, query_norm: str, haystack_norm: str) -> float:
+        """Score a record; both arguments must already be stripped/lower-cased."""
         if not query_norm:
             return 1.0
-        haystack_norm = haystack.lower()
         if query_norm in haystack_norm:
             return 0.95
         return 0.25
@@ -366,29 +442,11 @@ class SharedMemory:
         start_time = time.time()
         results: List[Dict[str, Any]] = []
         similarities: List[float] = []
-        records = self._in_memory_store.list_records(collection, tenant_id)
+        query_norm = (query or "").strip().lower()
+        records = self._in_memory_store.list_searchable(collection, tenant_id)
 
-        for record in records:
-            haystack_parts = []
-            if collection == self.COLLECTION_EXPERT_KNOWLEDGE:
-                haystack_parts.extend(
-                    [record.get("content", ""), record.get("expert_domain", "")]
-                )
-            elif collection == self.COLLECTION_COLLABORATION_HISTORY:
-                haystack_parts.extend(
-                    [
-                        record.get("interaction_id", ""),
-                        record.get("initiator_agent", ""),
-                        record.get("participating_agents", ""),
-                        record.get("task_description", ""),
-                    ]
-                )
-            elif collection == self.COLLECTION_PROBLEM_SOLUTIONS:
-                haystack_parts.extend([record.get("problem", ""), record.get("solution", "")])
-            else:
-                haystack_parts.append(json.dumps(record, default=str))
-            haystack = " ".join(str(part) for part in haystack_parts if part)
-            similarity = self._fallback_similarity(query, haystack)
+        for record, search_text in records:
+            similarity = self._fallback_similarity(query_norm, search_text)
             if similarity >= threshold:
                 result = {
                     "id": record.get("id"),
@@ -494,7 +552,7 @@ class SharedMemory:
             
         except Exception as e:
             logger.error("Failed to connect to Milvus", extra={"error": str(e)})
-            raise MilvusException(f"Milvus connection failed: {e}")
+            raise _milvus_exception(f"Milvus connection failed: {e}")
     
     def _create_collection_schema(self, collection_name: str) -> CollectionSchema:  # pragma: no cover
         """Create schema for the specified collection.
@@ -573,7 +631,7 @@ class SharedMemory:
                 "Failed to check Milvus collection existence",
                 extra={"collection": collection_name, "error": str(e), "phase": phase},
             )
-            raise MilvusException(f"Collection existence check failed: {e}") from e
+            raise _milvus_exception(f"Collection existence check failed: {e}") from e
         
         if not exists:
             schema = self._create_collection_schema(collection_name)
@@ -593,7 +651,7 @@ class SharedMemory:
                     "Failed to create Milvus collection",
                     extra={"collection": collection_name, "error": str(create_error), "phase": phase},
                 )
-                raise MilvusException(f"Collection creation failed: {create_error}") from create_error
+                raise _milvus_exception(f"Collection creation failed: {create_error}") from create_error
         else:
             collection = Collection(collection_name, using=self.connection_alias)
         
@@ -646,7 +704,7 @@ class SharedMemory:
                     "Failed to create Milvus index",
                     extra={"collection": collection_name, "error": str(index_error), "phase": phase},
                 )
-                raise MilvusException(f"Index creation failed: {index_error}") from index_error
+                raise _milvus_exception(f"Index creation failed: {index_error}") from index_error
         
         logger.debug(
             "Milvus collection ready",
@@ -683,7 +741,7 @@ class SharedMemory:
         except Exception as e:
             logger.error(f"Failed to get collection {collection_name}", extra={"error": str(e)})
             self.metrics.errors_count += 1
-            raise MilvusException(f"Failed to get collection: {e}") from e
+            raise _milvus_exception(f"Failed to get collection: {e}") from e
     
     def _should_bootstrap_on_error(self, error: Exception) -> bool:  # pragma: no cover
         """Check if the error indicates the collection or index needs bootstrapping.
@@ -734,6 +792,64 @@ class SharedMemory:
             self.metrics.errors_count += 1
             raise
     
+    def _generate_embeddings(
+        self, texts: List[str], *, count_failures: bool = True
+    ) -> List[List[float]]:  # pragma: no cover
+        """Generate embeddings for several texts, batching cache misses per request.
+
+        Distinct cache misses are sent in chunks of at most ``_EMBEDDING_BATCH_LIMIT``
+        inputs. With ``count_failures=False`` (best-effort callers that discard the
+        error) a failed request is neither logged as an error nor counted in metrics.
+        """
+        embeddings: List[Optional[List[float]]] = []
+        missing: Dict[str, List[int]] = {}
+        for index, text in enumerate(texts):
+            cached_embedding = self.embedding_cache.get(text, self.embedding_model)
+            if cached_embedding:
+                self.metrics.update_cache_stats(hit=True)
+            else:
+                missing.setdefault(text, []).append(index)
+            embeddings.append(cached_embedding)
+
+        pending = list(missing)
+        for start in range(0, len(pending), _EMBEDDING_BATCH_LIMIT):
+            chunk = pending[start:start + _EMBEDDING_BATCH_LIMIT]
+            try:
+                if count_failures:
+                    self.metrics.embedding_calls += 1
+                vectors = self.openai_client.get_embedding_vector(
+                    chunk, model_override=self.embedding_model
+                )
+                if len(vectors) != len(chunk):
+                    raise ValueError(
+                        f"Embedding provider returned {len(vectors)} vectors for {len(chunk)} inputs"
+                    )
+            except Exception as e:
+                if count_failures:
+                    logger.error("Failed to generate embeddings", extra={"error": str(e), "count": len(chunk)})
+                    self.metrics.errors_count += 1
+                raise
+            if not count_failures:
+                self.metrics.embedding_calls += 1
+
+            for text, embedding in zip(chunk, vectors):
+                self.embedding_cache.put(text, self.embedding_model, embedding)
+                self.metrics.update_cache_stats(hit=False)
+                for index in missing[text]:
+                    embeddings[index] = embedding
+
+        return embeddings
+
+    def _embedding_text(self, collection: str, content: Mapping[str, Any]) -> str:
+        """Return the text embedded for ``content`` in ``collection``."""
+        if collection == self.COLLECTION_EXPERT_KNOWLEDGE:
+            return content["content"]
+        if collection == self.COLLECTION_COLLABORATION_HISTORY:
+            return f"{content['task_description']} {content['participating_agents']}"
+        if collection == self.COLLECTION_PROBLEM_SOLUTIONS:
+            return f"{content['problem']} {content['solution']}"
+        raise ValueError(f"Unknown collection: {collection}")
+    
     def _prepare_data_for_collection(self, collection: str, content: Dict, embedding: List[float]) -> Dict:  # pragma: no cover
         """Prepare data dictionary for the specific collection.
         
@@ -842,15 +958,7 @@ class SharedMemory:
             
             # Generate embedding if not provided
             if embedding is None:
-                # Generate text for embedding based on collection type
-                if collection == self.COLLECTION_EXPERT_KNOWLEDGE:
-                    embed_text = content["content"]
-                elif collection == self.COLLECTION_COLLABORATION_HISTORY:
-                    embed_text = f"{content['task_description']} {content['participating_agents']}"
-                elif collection == self.COLLECTION_PROBLEM_SOLUTIONS:
-                    embed_text = f"{content['problem']} {content['solution']}"
-                
-                embedding = self._generate_embedding(embed_text)
+                embedding = self._generate_embedding(self._embedding_text(collection, content))
             
             # Prepare data
             data = self._prepare_data_for_collection(collection, content, embedding)
@@ -882,7 +990,7 @@ class SharedMemory:
                 extra={"error": str(e), "tenant_id": tenant_id}
             )
             self.metrics.errors_count += 1
-            raise MilvusException(f"Store operation failed: {e}")
+            raise _milvus_exception(f"Store operation failed: {e}")
     
     def search_knowledge(  # pragma: no cover
         self,
@@ -1117,20 +1225,11 @@ class SharedMemory:
                     )
                 return ids
             
-            # Generate embeddings if not provided
+            # Generate embeddings if not provided, in one request for all cache misses
             if embeddings is None:
-                embeddings = []
-                for content in contents:
-                    # Generate text for embedding
-                    if collection == self.COLLECTION_EXPERT_KNOWLEDGE:
-                        embed_text = content["content"]
-                    elif collection == self.COLLECTION_COLLABORATION_HISTORY:
-                        embed_text = f"{content['task_description']} {content['participating_agents']}"
-                    elif collection == self.COLLECTION_PROBLEM_SOLUTIONS:
-                        embed_text = f"{content['problem']} {content['solution']}"
-                    
-                    embedding = self._generate_embedding(embed_text)
-                    embeddings.append(embedding)
+                embeddings = self._generate_embeddings(
+                    [self._embedding_text(collection, content) for content in contents]
+                )
             
             # Prepare batch data
             batch_data = []
@@ -1171,7 +1270,7 @@ class SharedMemory:
                 extra={"error": str(e), "tenant_id": tenant_id}
             )
             self.metrics.errors_count += 1
-            raise MilvusException(f"Batch store failed: {e}")
+            raise _milvus_exception(f"Batch store failed: {e}")
     
     def batch_search_knowledge(  # pragma: no cover
         self,
@@ -1201,6 +1300,19 @@ class SharedMemory:
         List[List[Dict]]
             List of search results for each query.
         """
+        if not self._using_in_memory_backend():
+            # Warm the embedding cache in batched requests so each search below hits it.
+            valid_queries = [query for query in queries if isinstance(query, str) and query.strip()]
+            if valid_queries:
+                try:
+                    self._generate_embeddings(valid_queries, count_failures=False)
+                except Exception as e:
+                    # Each search_knowledge call below retries and counts its own failure.
+                    logger.warning(
+                        "Embedding warm-up for batch search failed",
+                        extra={"collection": collection, "tenant_id": tenant_id, "error": str(e)},
+                    )
+
         results = []
         for query in queries:
             result = self.search_knowledge(collection, tenant_id, query, top_k, threshold)
@@ -1324,7 +1436,7 @@ class SharedMemory:
                 extra={"error": str(e), "tenant_id": tenant_id}
             )
             self.metrics.errors_count += 1
-            raise MilvusException(f"Delete operation failed: {e}")
+            raise _milvus_exception(f"Delete operation failed: {e}")
     
     def clear_embedding_cache(self):
         """Clear the embedding cache."""
@@ -3,26 +3,52 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
-import uuid
+import os
 from typing import Any
 
-import requests
+import httpx
+
+try:
+    import orjson
+except ImportError:  # optional: fall back to the stdlib encoder
+    orjson = None
 
 BASE_URL = "http://localhost:8700/api"
-REGISTER_URL = f"{BASE_URL}/register"
-SEND_EVENT_URL = f"{BASE_URL}/send_event"
-UNREGISTER_URL = f"{BASE_URL}/unregister"
+REGISTER_PATH = "/register"
+SEND_EVENT_PATH = "/send_event"
+UNREGISTER_PATH = "/unregister"
+
+# Fields that never change between sends; only the ids and secret are per call.
+_EVENT_TEMPLATE: dict[str, Any] = {
+    "event_name": "user.message",
+    "target_agent_id": "general",
+    "payload": {"text": "What is Milvus?"},
+    "metadata": {},
+}
+
+
+def _format_json(data: Any) -> str:
+    """Pretty-print ``data`` as two-space indented JSON."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode("utf-8")
+    return json.dumps(data, indent=2, ensure_ascii=False)
+
+
+def _fast_id() -> str:
+    """Return a random 128-bit hex id without going through ``uuid.UUID``."""
+    return os.urandom(16).hex()
 
 
-def register() -> tuple[str, str | None]:
-    agent_id = f"simple-test-script-{uuid.uuid4()}"
+async def register(client: httpx.AsyncClient) -> tuple[str, str | None]:
+    agent_id = f"simple-test-script-{_fast_id()}"
     print(f"--- 1. Registering Agent '{agent_id}' ---")
     try:
-        reg_response = requests.post(REGISTER_URL, json={"agent_id": agent_id}, timeout=10)
+        reg_response = await client.post(REGISTER_PATH, json={"agent_id": agent_id}, timeout=10)
         reg_response.raise_for_status()
         reg_data: dict[str, Any] = reg_response.json()
-    except requests.exceptions.RequestException as exc:
+    except (httpx.HTTPError, ValueError) as exc:  # ValueError: non-JSON body
         print(f"❌ Error during registration: {exc}")
         return agent_id, None
 
@@ -39,31 +65,28 @@ def register() -> tuple[str, str | None]:
     return agent_id, secret
 
 
-def send_message(agent_id: str, secret: str) -> None:
+async def send_message(client: httpx.AsyncClient, agent_id: str, secret: str) -> None:
     print("\n--- 2. Sending Message ---")
 
     event_payload = {
-        "event_id": f"event-{uuid.uuid4()}",
-        "event_name": "user.message",
+        "event_id": f"event-{_fast_id()}",
         "source_id": agent_id,
-        "target_agent_id": "general",
-        "payload": {"text": "What is Milvus?"},
-        "metadata": {},
+        **_EVENT_TEMPLATE,
         "secret": secret,
     }
 
     print("Payload:")
-    print(json.dumps(event_payload, indent=2))
+    print(_format_json(event_payload))
 
     try:
-        response = requests.post(
-            SEND_EVENT_URL,
+        response = await client.post(
+            SEND_EVENT_PATH,
             headers={"Content-Type": "application/json"},
             json=event_payload,
             timeout=30,
         )
         response.raise_for_status()
-    except requests.exceptions.RequestException as exc:
+    except httpx.HTTPError as exc:
         print(f"\n--- Error ---\nAn error occurred while sending the message: {exc}")
         return
 
@@ -71,29 +94,29 @@ def send_message(agent_id: str, secret: str) -> None:
     print(f"Status Code: {response.status_code}")
     response_json: dict[str, Any] = response.json()
     print("Response JSON:")
-    print(json.dumps(response_json, indent=2))
+    print(_format_json(response_json))
 
     if response_json.get("data"):
         print("\n--- Agent's Reply ---")
-        print(json.dumps(response_json["data"], indent=2))
+        print(_format_json(response_json["data"]))
     else:
         print(f"\nNo direct agent reply in 'data' field. Message: {response_json.get('message')}")
 
 
-def unregister(agent_id: str, secret: str | None) -> None:
+async def unregister(client: httpx.AsyncClient, agent_id: str, secret: str | None) -> None:
     if not secret:
         return
 
     print(f"\n--- 3. Unregistering Agent '{agent_id}' ---")
     try:
-        unreg_response = requests.post(
-            UNREGISTER_URL,
+        unreg_response = await client.post(
+            UNREGISTER_PATH,
             json={"agent_id": agent_id, "secret": secret},
             timeout=10,
         )
         unreg_response.raise_for_status()
         payload: dict[str, Any] = unreg_response.json()
-    except requests.exceptions.RequestException as exc:
+    except (httpx.HTTPError, ValueError) as exc:  # ValueError: non-JSON body
         print(f"❌ Error during unregistration: {exc}")
         return
 
@@ -103,17 +126,23 @@ def unregister(agent_id: str, secret: str | None) -> None:
         print(f"⚠️ Unregistration failed: {payload.get('error_message')}")
 
 
-def main() -> int:
-    agent_id, secret = register()
-    if not secret:
-        return 1
+async def run_smoke_test(base_url: str = BASE_URL) -> int:
+    # One pooled client keeps the connection alive across all three calls.
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        agent_id, secret = await register(client)
+        if not secret:
+            return 1
 
-    try:
-        send_message(agent_id, secret)
-    finally:
-        unregister(agent_id, secret)
+        try:
+            await send_message(client, agent_id, secret)
+        finally:
+            await unregister(client, agent_id, secret)
     return 0
 
 
+def main() -> int:
+    return asyncio.run(run_smoke_test())
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -4,10 +4,12 @@ from __future__ import annotations
 
 import random
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator
 
 import pytest
 
+from utils.config_manager import ConfigManager, get_config_manager
+
 from .fixtures.fakes import (
     DummyMetrics,
     FakeOpenAIClient,
@@ -16,6 +18,11 @@ from .fixtures.fakes import (
     build_stub_openai_config,
 )
 
+try:
+    import uvloop
+except ImportError:  # pragma: no cover - optional speedup, not available on Windows
+    uvloop = None
+
 _ISOLATED_ENV_KEYS: Iterable[str] = (
     "CHAT_API_KEY",
     "CHAT_API_BASE_URL",
@@ -53,6 +60,14 @@ _ISOLATED_ENV_KEYS: Iterable[str] = (
 )
 
 
+_SHARED_CONFIG_YAML = """
+api_config:
+  agent_overrides:
+    coordination:
+      chat_model: "gpt-4"
+"""
+
+
 @pytest.fixture(autouse=True)
 def deterministic_seeds() -> None:
     """Ensure deterministic randomness across the test suite."""
@@ -77,6 +92,16 @@ def isolate_environment(monkeypatch: pytest.MonkeyPatch) -> None:
     except Exception:  # pragma: no cover - module import tested elsewhere
         return
     monkeypatch.setattr(openai_client, "load_dotenv", lambda *_, **__: False, raising=False)
+    # Memoized configs would otherwise leak between tests that share an env snapshot.
+    openai_client._clear_env_cache()
+
+
+if uvloop is not None:
+
+    def pytest_asyncio_loop_factories(config: pytest.Config, item: pytest.Item):
+        """Run asyncio tests on uvloop's libuv-backed event loop when it is installed."""
+
+        return {"uvloop": uvloop.new_event_loop}
 
 
 def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
@@ -140,3 +165,22 @@ def stub_agent_settings(monkeypatch: pytest.MonkeyPatch):
     )
     monkeypatch.setattr("utils.config_manager.get_agent_answer_verbose", lambda *_: False)
     return config
+
+
+@pytest.fixture(scope="session")
+def shared_config_path(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Write the shared YAML configuration once per session."""
+
+    path = tmp_path_factory.mktemp("shared_config") / "config.yaml"
+    path.write_text(_SHARED_CONFIG_YAML)
+    return path
+
+
+@pytest.fixture
+def shared_config_manager(shared_config_path: Path) -> Iterator[ConfigManager]:
+    """Return the process-wide manager for the shared config, parsed once per session."""
+
+    manager = get_config_manager(str(shared_config_path))
+    yield manager
+    # Agent configs reflect the per-test environment; the YAML itself is reused.
+    manager.invalidate(keep_yaml=True)
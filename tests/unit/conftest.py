@@ -0,0 +1,56 @@
+"""Unit-test configuration: warm the modules most unit tests import."""
+
+from __future__ import annotations
+
+import importlib
+import sys
+from unittest.mock import Mock
+
+import pytest
+
+# Imported once here so the cold import cost is paid during conftest loading
+# rather than inside whichever test module happens to be collected first.
+_WARM_MODULES = (
+    "agents.base",
+    "agents.coordination.agent",
+    "tools.browser_tool",
+    "utils.openai_client",
+)
+
+for _module in _WARM_MODULES:
+    try:
+        importlib.import_module(_module)
+    except ImportError:  # pragma: no cover - the owning test module reports the failure
+        pass
+
+
+class MockMilvusException(Exception):
+    """Stand-in for ``pymilvus.MilvusException``."""
+
+
+def _build_mock_pymilvus() -> Mock:
+    mock_pymilvus = Mock()
+    mock_pymilvus.connections = Mock()
+    mock_pymilvus.Collection = Mock
+    mock_pymilvus.CollectionSchema = Mock
+    mock_pymilvus.DataType = Mock()
+    mock_pymilvus.DataType.INT64 = 'INT64'
+    mock_pymilvus.DataType.VARCHAR = 'VARCHAR'
+    mock_pymilvus.DataType.FLOAT_VECTOR = 'FLOAT_VECTOR'
+    mock_pymilvus.FieldSchema = Mock
+    mock_pymilvus.MilvusException = MockMilvusException
+    mock_pymilvus.utility = Mock()
+    return mock_pymilvus
+
+
+@pytest.fixture(scope="session")
+def mock_pymilvus():
+    """Install one ``pymilvus`` stub in ``sys.modules`` for every test that asks for it.
+
+    ``agents.shared_memory`` imports pymilvus lazily, so the stub only has to be
+    in place before the first Milvus-backed call, not before the module import.
+    """
+    stub = _build_mock_pymilvus()
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setitem(sys.modules, 'pymilvus', stub)
+        yield stub
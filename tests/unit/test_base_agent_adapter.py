@@ -7,15 +7,46 @@ import pytest
 from agents.base import AgentResponse, BaseAgent
 from agents.types import ExpertKind, Layer
 
+# asyncio_mode = auto already collects the coroutines; share one loop per module
+# instead of creating and closing a fresh loop for every test.
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+
+def _make_agent(name, handler, **attrs):
+    """Build a ``BaseAgent`` subclass once, running the ``__init_subclass__`` shim."""
+    return type(name, (BaseAgent,), {"name": name, "handle_message": handler, **attrs})
+
+
+async def _respond_ok(self, message, conversation_state=None):
+    return AgentResponse("ok", {"message": "seen"})
+
+
+LegacyAgent = _make_agent(
+    "legacy_sync", lambda self, message, conversation_state=None: f"legacy:{message}"
+)
+TupleAgent = _make_agent(
+    "tuple_agent",
+    lambda self, message, conversation_state=None: ("tuple-response", {"source": "tuple"}),
+)
+MappingAgent = _make_agent(
+    "mapping_agent",
+    lambda self, message, conversation_state=None: {
+        "content": "mapping-response",
+        "metadata": {"source": "mapping"},
+    },
+)
+NoneAgent = _make_agent("none_agent", lambda self, message, conversation_state=None: None)
+DevOpsAgent = _make_agent(
+    "devops_agent",
+    _respond_ok,
+    expert_kind=ExpertKind.DEVOPS_EXPERT,
+    layer="expert",
+    role="",
+)
+CoercionAgent = _make_agent("coercion_agent", _respond_ok)
 
-@pytest.mark.asyncio
-async def test_sync_handle_message_converts_to_agent_response() -> None:
-    class LegacyAgent(BaseAgent):
-        name = "legacy_sync"
-
-        def handle_message(self, message, conversation_state=None):  # type: ignore[override]
-            return f"legacy:{message}"
 
+async def test_sync_handle_message_converts_to_agent_response() -> None:
     agent = LegacyAgent()
 
     direct_response = await agent.handle_message("payload")
@@ -29,20 +60,7 @@ async def test_sync_handle_message_converts_to_agent_response() -> None:
     assert act_response.metadata == {}
 
 
-@pytest.mark.asyncio
 async def test_tuple_and_mapping_payloads_are_coerced() -> None:
-    class TupleAgent(BaseAgent):
-        name = "tuple_agent"
-
-        def handle_message(self, message, conversation_state=None):  # type: ignore[override]
-            return ("tuple-response", {"source": "tuple"})
-
-    class MappingAgent(BaseAgent):
-        name = "mapping_agent"
-
-        def handle_message(self, message, conversation_state=None):  # type: ignore[override]
-            return {"content": "mapping-response", "metadata": {"source": "mapping"}}
-
     tuple_agent = TupleAgent()
     mapping_agent = MappingAgent()
 
@@ -55,31 +73,14 @@ async def test_tuple_and_mapping_payloads_are_coerced() -> None:
     assert mapping_response.metadata == {"source": "mapping"}
 
 
-@pytest.mark.asyncio
 async def test_none_payload_defaults_to_empty_response() -> None:
-    class NoneAgent(BaseAgent):
-        name = "none_agent"
-
-        def handle_message(self, message, conversation_state=None):  # type: ignore[override]
-            return None
-
     agent = NoneAgent()
     response = await agent.handle_message("unused")
     assert response.content == ""
     assert response.metadata == {}
 
 
-@pytest.mark.asyncio
 async def test_role_defaults_follow_expert_kind_and_layer_coercion() -> None:
-    class DevOpsAgent(BaseAgent):
-        name = "devops_agent"
-        expert_kind = ExpertKind.DEVOPS_EXPERT
-        layer = "expert"
-        role = ""
-
-        async def handle_message(self, message, conversation_state=None):
-            return AgentResponse("ok", {"message": "seen"})
-
     agent = DevOpsAgent()
 
     assert agent.role == "devops_expert"
@@ -90,24 +91,21 @@ async def test_role_defaults_follow_expert_kind_and_layer_coercion() -> None:
     assert route_payload["expert_kind"] == ExpertKind.DEVOPS_EXPERT.value
 
 
-@pytest.mark.asyncio
-async def test_coerce_agent_response_handles_edge_cases() -> None:
-    class CoercionAgent(BaseAgent):
-        name = "coercion_agent"
-
-        async def handle_message(self, message, conversation_state=None):
-            return AgentResponse("ok", {})
-
-    agent = CoercionAgent()
-
-    tuple_response = agent._coerce_agent_response(("tuple", 42))
-    assert tuple_response.content == "tuple"
-    assert tuple_response.metadata == {"value": 42}
-
-    mapping_response = agent._coerce_agent_response({"metadata": 7, "other": "data"})
-    assert mapping_response.content == "{'other': 'data'}"
-    assert mapping_response.metadata == {"value": 7}
-
-    scalar_response = agent._coerce_agent_response(123)
-    assert scalar_response.content == "123"
-    assert scalar_response.metadata == {}
+@pytest.fixture(scope="module")
+def coercion_agent() -> BaseAgent:
+    return CoercionAgent()
+
+
+@pytest.mark.parametrize(
+    "payload, content, metadata",
+    [
+        (("tuple", 42), "tuple", {"value": 42}),
+        ({"metadata": 7, "other": "data"}, "{'other': 'data'}", {"value": 7}),
+        (123, "123", {}),
+    ],
+    ids=["tuple", "mapping", "scalar"],
+)
+async def test_coerce_agent_response_handles_edge_cases(coercion_agent, payload, content, metadata) -> None:
+    response = coercion_agent._coerce_agent_response(payload)
+    assert response.content == content
+    assert response.metadata == metadata
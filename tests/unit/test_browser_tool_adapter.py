@@ -4,10 +4,11 @@ This module tests the browser tool implementation with mocked external dependenc
 to verify configuration wiring, error translation, and LLM configuration forwarding.
 """
 
-import os
+import httpx
 import pytest
-from unittest.mock import Mock, AsyncMock, patch, MagicMock
-from dataclasses import asdict
+from unittest.mock import Mock, AsyncMock, patch
+from dataclasses import replace
+from types import MappingProxyType
 
 # Import browser tool components
 from tools.browser_tool import (
@@ -15,60 +16,63 @@ from tools.browser_tool import (
     BrowserResult,
     SearchResult,
     PageContent,
-    BrowserToolError,
     SearchProviderError,
     NavigationError,
-    ExtractionError,
     RateLimitError,
     TavilySearchEngine,
     DuckDuckGoSearchEngine,
     create_search_engine,
-    PageNavigator,
     ContentParser,
 )
 from utils.openai_client import BrowserToolConfig
 
 
+# Tests that mutate os.environ share one worker under ``pytest -n auto --dist loadgroup``;
+# everything else is pure compute and spreads freely across workers.
+def _env_serial(obj):
+    return pytest.mark.serial(pytest.mark.xdist_group(name="env")(obj))
+
+
 # ==================== FIXTURES ====================
 
+_BROWSER_ENV_VARS = frozenset({
+    'BROWSER_TOOL_ENABLED',
+    'BROWSER_SEARCH_PROVIDER',
+    'BROWSER_SEARCH_API_KEY',
+    'TAVILY_API_KEY',
+    'BROWSER_SEARCH_BASE_URL',
+    'BROWSER_FALLBACK_PROVIDER',
+    'BROWSER_ENGINE',
+    'BROWSER_HEADLESS',
+    'BROWSER_USER_AGENT',
+    'BROWSER_VIEWPORT_WIDTH',
+    'BROWSER_VIEWPORT_HEIGHT',
+    'BROWSER_SEARCH_TIMEOUT',
+    'BROWSER_NAVIGATION_TIMEOUT',
+    'BROWSER_EXTRACTION_TIMEOUT',
+    'BROWSER_MAX_RETRIES',
+    'BROWSER_RETRY_DELAY',
+    'BROWSER_RATE_LIMIT_DELAY',
+    'BROWSER_MAX_CONTENT_LENGTH',
+    'BROWSER_EXTRACT_IMAGES',
+    'BROWSER_EXTRACT_LINKS',
+    'BROWSER_CACHE_ENABLED',
+    'BROWSER_CACHE_TTL',
+})
+
+
 @pytest.fixture
 def clean_env(monkeypatch):
     """Clean environment for testing."""
-    browser_env_vars = [
-        'BROWSER_TOOL_ENABLED',
-        'BROWSER_SEARCH_PROVIDER',
-        'BROWSER_SEARCH_API_KEY',
-        'TAVILY_API_KEY',
-        'BROWSER_SEARCH_BASE_URL',
-        'BROWSER_FALLBACK_PROVIDER',
-        'BROWSER_ENGINE',
-        'BROWSER_HEADLESS',
-        'BROWSER_USER_AGENT',
-        'BROWSER_VIEWPORT_WIDTH',
-        'BROWSER_VIEWPORT_HEIGHT',
-        'BROWSER_SEARCH_TIMEOUT',
-        'BROWSER_NAVIGATION_TIMEOUT',
-        'BROWSER_EXTRACTION_TIMEOUT',
-        'BROWSER_MAX_RETRIES',
-        'BROWSER_RETRY_DELAY',
-        'BROWSER_RATE_LIMIT_DELAY',
-        'BROWSER_MAX_CONTENT_LENGTH',
-        'BROWSER_EXTRACT_IMAGES',
-        'BROWSER_EXTRACT_LINKS',
-        'BROWSER_CACHE_ENABLED',
-        'BROWSER_CACHE_TTL',
-    ]
-    
-    for var in browser_env_vars:
-        if var in os.environ:
-            monkeypatch.delenv(var, raising=False)
+    for var in _BROWSER_ENV_VARS:
+        monkeypatch.delenv(var, raising=False)
     
     yield monkeypatch
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def default_config():
-    """Default browser tool configuration."""
+    """Default browser tool configuration (shared; do not mutate)."""
     return BrowserToolConfig(
         enabled=True,
         search_provider="tavily",
@@ -83,6 +87,12 @@ def default_config():
     )
 
 
+@pytest.fixture(scope="session")
+def fast_retry_config(default_config):
+    """``default_config`` with a single search attempt, so retry paths fail fast."""
+    return replace(default_config, max_retries=1)
+
+
 @pytest.fixture
 def mock_httpx_response():
     """Mock httpx response."""
@@ -92,32 +102,89 @@ def mock_httpx_response():
     return mock_response
 
 
-@pytest.fixture
-def tavily_search_results():
-    """Sample Tavily search results."""
-    return {
-        "answer": "Milvus is a vector database",
-        "results": [
-            {
-                "title": "Milvus Documentation",
-                "url": "https://milvus.io/docs",
-                "content": "Official Milvus documentation",
-                "score": 0.95
-            },
-            {
-                "title": "Milvus GitHub",
-                "url": "https://github.com/milvus-io/milvus",
-                "content": "Milvus vector database repository",
-                "score": 0.90
-            }
-        ]
-    }
+class _FakeAsyncClient:
+    """Minimal stand-in for ``httpx.AsyncClient`` used as an async context manager."""
+    
+    def __init__(self, post):
+        self._post = post
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        return None
+    
+    async def post(self, *args, **kwargs):
+        return await self._post(*args, **kwargs)
 
 
 @pytest.fixture
-def duckduckgo_html():
-    """Sample DuckDuckGo HTML response."""
-    return """
+def mock_httpx_post(monkeypatch):
+    """Patch ``httpx.AsyncClient`` so ``post`` returns a canned response.
+
+    The returned ``install`` helper takes ``json=``/``text=`` for the response body,
+    ``status=`` to make ``raise_for_status`` fail with that HTTP status, ``raises=``
+    to make ``post`` itself raise, or ``post=`` to supply a custom coroutine.
+    """
+    def install(*, json=None, text=None, status=200, raises=None, post=None):
+        # Response accessors are synchronous on httpx; only the client is async.
+        mock_response = Mock(spec=httpx.Response)
+        mock_response.status_code = status
+        mock_response.json.return_value = json
+        mock_response.text = text
+        if status >= 400:
+            mock_response.raise_for_status = Mock(side_effect=httpx.HTTPStatusError(
+                f"HTTP {status}", request=Mock(), response=mock_response
+            ))
+        else:
+            mock_response.raise_for_status = Mock()
+        
+        if post is None:
+            async def post(*args, **kwargs):
+                if raises is not None:
+                    raise raises
+                return mock_response
+        
+        monkeypatch.setattr(httpx, 'AsyncClient', lambda *args, **kwargs: _FakeAsyncClient(post))
+        return mock_response
+    
+    return install
+
+
+@pytest.fixture(scope="module")
+def browser_tool(default_config):
+    """BrowserTool built once per module from ``default_config``."""
+    with patch('tools.browser_tool.get_browser_tool_config', return_value=default_config):
+        return BrowserTool(agent_name="test")
+
+
+@pytest.fixture(scope="module")
+def fast_retry_tool(fast_retry_config):
+    """BrowserTool built once per module from ``fast_retry_config``."""
+    with patch('tools.browser_tool.get_browser_tool_config', return_value=fast_retry_config):
+        return BrowserTool(agent_name="test")
+
+
+# Read-only sample payloads, built once at import and shared by every test.
+_TAVILY_RESULTS = MappingProxyType({
+    "answer": "Milvus is a vector database",
+    "results": (
+        {
+            "title": "Milvus Documentation",
+            "url": "https://milvus.io/docs",
+            "content": "Official Milvus documentation",
+            "score": 0.95
+        },
+        {
+            "title": "Milvus GitHub",
+            "url": "https://github.com/milvus-io/milvus",
+            "content": "Milvus vector database repository",
+            "score": 0.90
+        }
+    ),
+})
+
+_DUCKDUCKGO_HTML = """
     <html>
         <body>
             <div class="result">
@@ -132,11 +199,7 @@ def duckduckgo_html():
     </html>
     """
 
-
-@pytest.fixture
-def sample_html_content():
-    """Sample HTML content for extraction."""
-    return """
+_SAMPLE_HTML = """
     <!DOCTYPE html>
     <html>
         <head>
@@ -155,8 +218,21 @@ def sample_html_content():
     """
 
 
+@pytest.fixture(scope="session")
+def tavily_search_results():
+    """Sample Tavily search results (read-only, shared across the session)."""
+    return _TAVILY_RESULTS
+
+
+@pytest.fixture(scope="session")
+def duckduckgo_html():
+    """Sample DuckDuckGo HTML response."""
+    return _DUCKDUCKGO_HTML
+
+
 # ==================== CONFIGURATION TESTS ====================
 
+@_env_serial
 class TestBrowserToolConfig:
     """Test BrowserToolConfig loading and validation."""
     
@@ -197,25 +273,48 @@ class TestBrowserToolConfig:
         assert config.search_timeout == 20
         assert config.max_retries == 5
     
-    def test_config_bool_parsing(self, clean_env):
+    @pytest.mark.parametrize("value,expected", [
+        ('true', True),
+        ('True', True),
+        ('1', True),
+        ('yes', True),
+        ('on', True),
+        ('false', False),
+        ('False', False),
+        ('0', False),
+        ('no', False),
+        ('off', False),
+    ])
+    def test_config_bool_parsing(self, clean_env, value, expected):
         """Test boolean environment variable parsing."""
-        test_cases = [
-            ('true', True),
-            ('True', True),
-            ('1', True),
-            ('yes', True),
-            ('on', True),
-            ('false', False),
-            ('False', False),
-            ('0', False),
-            ('no', False),
-            ('off', False),
-        ]
-        
-        for value, expected in test_cases:
-            clean_env.setenv('BROWSER_TOOL_ENABLED', value)
-            config = BrowserToolConfig.from_env(load_env=False)
-            assert config.enabled == expected, f"Failed for value '{value}'"
+        clean_env.setenv('BROWSER_TOOL_ENABLED', value)
+        config = BrowserToolConfig.from_env(load_env=False)
+        assert config.enabled == expected
+    
+    @pytest.mark.parametrize("agent_name,provider,timeout", [
+        ("agent1", "tavily", 10),
+        ("agent2", "duckduckgo", 20),
+    ])
+    def test_agent_specific_config(self, clean_env, agent_name, provider, timeout):
+        """Test that BrowserTool looks up its configuration by agent name."""
+        configs = {
+            "agent1": BrowserToolConfig(
+                search_provider="tavily",
+                search_api_key="key1",
+                search_timeout=10
+            ),
+            "agent2": BrowserToolConfig(
+                search_provider="duckduckgo",
+                search_api_key="key2",
+                search_timeout=20
+            ),
+        }
+        clean_env.setattr('tools.browser_tool.get_browser_tool_config', configs.__getitem__)
+        
+        tool = BrowserTool(agent_name=agent_name)
+        
+        assert tool.config.search_provider == provider
+        assert tool.config.search_timeout == timeout
 
 
 # ==================== SEARCH ENGINE TESTS ====================
@@ -223,67 +322,18 @@ class TestBrowserToolConfig:
 class TestTavilySearchEngine:
     """Test Tavily search engine implementation."""
     
-    @pytest.mark.asyncio
-    async def test_tavily_search_success(self, default_config, tavily_search_results):
+    async def test_tavily_search_success(self, default_config, tavily_search_results, mock_httpx_post):
         """Test successful Tavily search."""
         engine = TavilySearchEngine(default_config)
+        mock_httpx_post(json=tavily_search_results)
         
-        with patch('httpx.AsyncClient') as mock_client:
-            mock_response = AsyncMock()
-            mock_response.json = AsyncMock(return_value=tavily_search_results)
-            mock_response.raise_for_status = Mock()
-            
-            mock_context = AsyncMock()
-            mock_context.__aenter__.return_value.post = AsyncMock(return_value=mock_response)
-            mock_client.return_value = mock_context
-            
-            results = await engine.query("test query", max_results=5)
-            
-            assert len(results) == 2
-            assert results[0].title == "Milvus Documentation"
-            assert results[0].url == "https://milvus.io/docs"
-            assert results[0].score == 0.95
-            assert results[0].metadata["provider"] == "tavily"
-    
-    @pytest.mark.asyncio
-    async def test_tavily_search_rate_limit(self, default_config):
-        """Test Tavily rate limit error handling."""
-        engine = TavilySearchEngine(default_config)
+        results = await engine.query("test query", max_results=5)
         
-        with patch('httpx.AsyncClient') as mock_client:
-            mock_response = AsyncMock()
-            mock_response.status_code = 429
-            # raise_for_status is NOT async, so use Mock instead of AsyncMock
-            mock_response.raise_for_status = Mock(side_effect=__import__('httpx').HTTPStatusError(
-                "Rate limit", request=Mock(), response=mock_response
-            ))
-            
-            mock_context = AsyncMock()
-            mock_context.__aenter__.return_value.post = AsyncMock(return_value=mock_response)
-            mock_client.return_value = mock_context
-            
-            with pytest.raises(RateLimitError):
-                await engine.query("test query", max_results=5)
-    
-    @pytest.mark.asyncio
-    async def test_tavily_search_auth_error(self, default_config):
-        """Test Tavily authentication error handling."""
-        engine = TavilySearchEngine(default_config)
-        
-        with patch('httpx.AsyncClient') as mock_client:
-            mock_response = AsyncMock()
-            mock_response.status_code = 401
-            # raise_for_status is NOT async, so use Mock instead of AsyncMock
-            mock_response.raise_for_status = Mock(side_effect=__import__('httpx').HTTPStatusError(
-                "Unauthorized", request=Mock(), response=mock_response
-            ))
-            
-            mock_context = AsyncMock()
-            mock_context.__aenter__.return_value.post = AsyncMock(return_value=mock_response)
-            mock_client.return_value = mock_context
-            
-            with pytest.raises(SearchProviderError, match="(authentication failed|Tavily API error)"):
-                await engine.query("test query", max_results=5)
+        assert len(results) == 2
+        assert results[0].title == "Milvus Documentation"
+        assert results[0].url == "https://milvus.io/docs"
+        assert results[0].score == 0.95
+        assert results[0].metadata["provider"] == "tavily"
     
     def test_tavily_requires_api_key(self):
         """Test that Tavily engine requires API key."""
@@ -296,43 +346,38 @@ class TestTavilySearchEngine:
 class TestDuckDuckGoSearchEngine:
     """Test DuckDuckGo search engine implementation."""
     
-    @pytest.mark.asyncio
-    async def test_duckduckgo_search_success(self, default_config, duckduckgo_html):
+    async def test_duckduckgo_search_success(self, default_config, duckduckgo_html, mock_httpx_post):
         """Test successful DuckDuckGo search."""
         engine = DuckDuckGoSearchEngine(default_config)
+        mock_httpx_post(text=duckduckgo_html)
         
-        with patch('httpx.AsyncClient') as mock_client:
-            mock_response = AsyncMock()
-            mock_response.text = duckduckgo_html
-            mock_response.raise_for_status = Mock()
-            
-            mock_context = AsyncMock()
-            mock_context.__aenter__.return_value.post = AsyncMock(return_value=mock_response)
-            mock_client.return_value = mock_context
-            
-            results = await engine.query("test query", max_results=5)
-            
-            assert len(results) == 2
-            assert results[0].title == "Example Page 1"
-            assert results[0].url == "https://example.com/page1"
-            assert results[0].metadata["provider"] == "duckduckgo"
-    
-    @pytest.mark.asyncio
-    async def test_duckduckgo_search_timeout(self, default_config):
-        """Test DuckDuckGo timeout handling."""
-        engine = DuckDuckGoSearchEngine(default_config)
+        results = await engine.query("test query", max_results=5)
         
-        with patch('httpx.AsyncClient') as mock_client:
-            mock_context = AsyncMock()
-            mock_context.__aenter__.return_value.post = AsyncMock(
-                side_effect=__import__('httpx').TimeoutException("Timeout")
-            )
-            mock_client.return_value = mock_context
-            
-            with pytest.raises(SearchProviderError, match="timeout"):
-                await engine.query("test query", max_results=5)
+        assert len(results) == 2
+        assert results[0].title == "Example Page 1"
+        assert results[0].url == "https://example.com/page1"
+        assert results[0].metadata["provider"] == "duckduckgo"
 
 
+class TestSearchEngineFailures:
+    """Test provider failures are normalized to search errors."""
+    
+    @pytest.mark.parametrize("engine_cls,status,exc_cls,match", [
+        (TavilySearchEngine, 429, RateLimitError, None),
+        (TavilySearchEngine, 401, SearchProviderError, "(authentication failed|Tavily API error)"),
+        (DuckDuckGoSearchEngine, None, SearchProviderError, "timeout"),
+    ], ids=["tavily-rate-limit", "tavily-auth", "duckduckgo-timeout"])
+    async def test_provider_failure(self, default_config, mock_httpx_post, engine_cls, status, exc_cls, match):
+        """Test HTTP errors and timeouts raise the expected error type."""
+        engine = engine_cls(default_config)
+        if status is None:
+            mock_httpx_post(raises=httpx.TimeoutException("Timeout"))
+        else:
+            mock_httpx_post(status=status)
+        
+        with pytest.raises(exc_cls, match=match):
+            await engine.query("test query", max_results=5)
+
 class TestSearchEngineFactory:
     """Test search engine factory function."""
     
@@ -357,10 +402,16 @@ class TestSearchEngineFactory:
 class TestContentParser:
     """Test HTML content parser."""
     
-    def test_extract_from_html_basic(self, default_config, sample_html_content):
-        """Test basic HTML extraction."""
+    @pytest.fixture(scope="class")
+    @classmethod
+    def extracted_sample(cls, default_config):
+        """Parse ``_SAMPLE_HTML`` once with the default config (shared; do not mutate)."""
         parser = ContentParser(default_config)
-        extracted = parser.extract_from_html(sample_html_content, "https://example.com")
+        return parser.extract_from_html(_SAMPLE_HTML, "https://example.com")
+    
+    def test_extract_from_html_basic(self, extracted_sample):
+        """Test basic HTML extraction."""
+        extracted = extracted_sample
         
         assert extracted["title"] == "Test Page"
         assert "Test Heading" in extracted["text"]
@@ -369,32 +420,33 @@ class TestContentParser:
         assert "console.log" not in extracted["text"]
         assert "color: red" not in extracted["text"]
     
-    def test_extract_links(self, default_config, sample_html_content):
+    def test_extract_links(self, extracted_sample):
         """Test link extraction."""
-        parser = ContentParser(default_config)
-        extracted = parser.extract_from_html(sample_html_content, "https://example.com")
+        extracted = extracted_sample
         
         assert len(extracted["links"]) == 2
         # Relative link should be resolved
         assert "https://example.com/relative-link" in extracted["links"]
         assert "https://example.com/absolute" in extracted["links"]
     
-    def test_extract_images(self, default_config, sample_html_content):
+    def test_extract_images(self, default_config):
         """Test image extraction when enabled."""
         config = BrowserToolConfig(extract_images=True)
         parser = ContentParser(config)
-        extracted = parser.extract_from_html(sample_html_content, "https://example.com")
+        extracted = parser.extract_from_html(_SAMPLE_HTML, "https://example.com")
         
         assert len(extracted["images"]) == 1
         assert "https://example.com/image.jpg" in extracted["images"]
     
     def test_content_length_truncation(self, default_config):
         """Test content length truncation."""
-        long_html = f"<html><body><p>{'x' * 200000}</p></body></html>"
+        body = "x" * (default_config.max_content_length + 100)
+        long_html = f"<html><body><p>{body}</p></body></html>"
         parser = ContentParser(default_config)
         extracted = parser.extract_from_html(long_html)
         
         assert len(extracted["text"]) <= default_config.max_content_length + 3  # +3 for "..."
+        assert extracted["text"].endswith("...")
 
 
 # ==================== BROWSER TOOL INTEGRATION TESTS ====================
@@ -402,118 +454,86 @@ class TestContentParser:
 class TestBrowserTool:
     """Test main BrowserTool class."""
     
-    @pytest.mark.asyncio
+    @_env_serial
     async def test_browser_tool_initialization(self, clean_env):
         """Test BrowserTool initialization."""
         clean_env.setenv('BROWSER_SEARCH_API_KEY', 'test-key')
         
-        with patch('tools.browser_tool.get_browser_tool_config') as mock_config:
-            mock_config.return_value = BrowserToolConfig(
-                search_provider="tavily",
-                search_api_key="test-key"
-            )
-            
-            tool = BrowserTool(agent_name="test_agent")
-            
-            assert tool.agent_name == "test_agent"
-            assert tool.config.search_provider == "tavily"
-            mock_config.assert_called_once_with("test_agent")
+        mock_config = Mock(return_value=BrowserToolConfig(
+            search_provider="tavily",
+            search_api_key="test-key"
+        ))
+        clean_env.setattr('tools.browser_tool.get_browser_tool_config', mock_config)
+        
+        tool = BrowserTool(agent_name="test_agent")
+        
+        assert tool.agent_name == "test_agent"
+        assert tool.config.search_provider == "tavily"
+        mock_config.assert_called_once_with("test_agent")
     
-    @pytest.mark.asyncio
-    async def test_search_success(self, default_config, tavily_search_results):
+    async def test_search_success(self, browser_tool, tavily_search_results, mock_httpx_post):
         """Test successful search operation."""
-        with patch('tools.browser_tool.get_browser_tool_config', return_value=default_config):
-            tool = BrowserTool(agent_name="test")
-            
-            with patch('httpx.AsyncClient') as mock_client:
-                mock_response = AsyncMock()
-                mock_response.json = AsyncMock(return_value=tavily_search_results)
-                mock_response.raise_for_status = Mock()
-                
-                mock_context = AsyncMock()
-                mock_context.__aenter__.return_value.post = AsyncMock(return_value=mock_response)
-                mock_client.return_value = mock_context
-                
-                result = await tool.search("test query", max_results=5)
-                
-                assert result.query == "test query"
-                assert len(result.search_results) == 2
-                assert result.error is None
-                assert result.metadata["provider"] == "tavily"
-                assert "latency_seconds" in result.metadata
-    
-    @pytest.mark.asyncio
-    async def test_search_with_fallback(self, default_config, duckduckgo_html):
+        mock_httpx_post(json=tavily_search_results)
+        
+        result = await browser_tool.search("test query", max_results=5)
+        
+        assert result.query == "test query"
+        assert len(result.search_results) == 2
+        assert result.error is None
+        assert result.metadata["provider"] == "tavily"
+        assert "latency_seconds" in result.metadata
+    
+    async def test_search_with_fallback(self, fast_retry_tool, fast_retry_config, duckduckgo_html, mock_httpx_post):
         """Test search fallback when primary fails."""
-        with patch('tools.browser_tool.get_browser_tool_config', return_value=default_config):
-            tool = BrowserTool(agent_name="test")
-            
-            call_count = 0
-            
-            async def mock_post(*args, **kwargs):
-                nonlocal call_count
-                call_count += 1
-                
-                if call_count <= default_config.max_retries:
-                    # First calls fail (Tavily)
-                    mock_response = AsyncMock()
-                    mock_response.status_code = 429
-                    mock_response.raise_for_status.side_effect = __import__('httpx').HTTPStatusError(
-                        "Rate limit", request=Mock(), response=mock_response
-                    )
-                    return mock_response
-                else:
-                    # Fallback succeeds (DuckDuckGo)
-                    mock_response = AsyncMock()
-                    mock_response.text = duckduckgo_html
-                    mock_response.raise_for_status = Mock()
-                    return mock_response
+        call_count = 0
+        
+        async def mock_post(*args, **kwargs):
+            nonlocal call_count
+            call_count += 1
             
-            with patch('httpx.AsyncClient') as mock_client:
-                mock_context = AsyncMock()
-                mock_context.__aenter__.return_value.post = mock_post
-                mock_client.return_value = mock_context
-                
-                result = await tool.search("test query", max_results=5)
-                
-                assert result.error is None
-                assert result.metadata["fallback"] is True
-                assert result.metadata["provider"] == "duckduckgo"
-                assert len(result.search_results) == 2
-    
-    @pytest.mark.asyncio
-    async def test_search_all_providers_fail(self, default_config):
+            if call_count <= fast_retry_config.max_retries:
+                # First calls fail (Tavily)
+                mock_response = Mock(spec=httpx.Response)
+                mock_response.status_code = 429
+                mock_response.raise_for_status.side_effect = httpx.HTTPStatusError(
+                    "Rate limit", request=Mock(), response=mock_response
+                )
+                return mock_response
+            else:
+                # Fallback succeeds (DuckDuckGo)
+                mock_response = Mock(spec=httpx.Response)
+                mock_response.text = duckduckgo_html
+                return mock_response
+        
+        mock_httpx_post(post=mock_post)
+        
+        result = await fast_retry_tool.search("test query", max_results=5)
+        
+        assert result.error is None
+        assert result.metadata["fallback"] is True
+        assert result.metadata["provider"] == "duckduckgo"
+        assert len(result.search_results) == 2
+    
+    async def test_search_all_providers_fail(self, fast_retry_tool, mock_httpx_post):
         """Test when all search providers fail."""
-        with patch('tools.browser_tool.get_browser_tool_config', return_value=default_config):
-            tool = BrowserTool(agent_name="test")
-            
-            with patch('httpx.AsyncClient') as mock_client:
-                mock_response = AsyncMock()
-                mock_response.status_code = 500
-                # raise_for_status is NOT async, so use Mock instead of AsyncMock
-                mock_response.raise_for_status = Mock(side_effect=__import__('httpx').HTTPStatusError(
-                    "Server error", request=Mock(), response=mock_response
-                ))
-                
-                mock_context = AsyncMock()
-                mock_context.__aenter__.return_value.post = AsyncMock(return_value=mock_response)
-                mock_client.return_value = mock_context
-                
-                result = await tool.search("test query", max_results=5)
-                
-                assert result.error is not None
-                assert "All search providers failed" in result.error
-                assert len(result.search_results) == 0
-    
-    @pytest.mark.asyncio
-    async def test_browser_tool_context_manager(self, default_config):
+        mock_httpx_post(status=500)
+        
+        result = await fast_retry_tool.search("test query", max_results=5)
+        
+        assert result.error is not None
+        assert "All search providers failed" in result.error
+        assert len(result.search_results) == 0
+    
+    async def test_browser_tool_context_manager(self, default_config, monkeypatch):
         """Test BrowserTool as async context manager."""
-        with patch('tools.browser_tool.get_browser_tool_config', return_value=default_config):
-            async with BrowserTool(agent_name="test") as tool:
-                assert tool is not None
-                assert tool.agent_name == "test"
-            
-            # Tool should be closed after context
+        monkeypatch.setattr(
+            'tools.browser_tool.get_browser_tool_config', lambda *_: default_config
+        )
+        async with BrowserTool(agent_name="test") as tool:
+            assert tool is not None
+            assert tool.agent_name == "test"
+        
+        # Tool should be closed after context
 
 
 # ==================== ERROR HANDLING TESTS ====================
@@ -521,8 +541,7 @@ class TestBrowserTool:
 class TestErrorHandling:
     """Test error handling and normalization."""
     
-    @pytest.mark.asyncio
-    async def test_navigation_error_when_engine_disabled(self, default_config):
+    async def test_navigation_error_when_engine_disabled(self, monkeypatch):
         """Test that navigation fails when browser engine is disabled."""
         config = BrowserToolConfig(
             browser_engine="none",
@@ -530,11 +549,11 @@ class TestErrorHandling:
             search_api_key=None
         )
         
-        with patch('tools.browser_tool.get_browser_tool_config', return_value=config):
-            tool = BrowserTool(agent_name="test")
-            
-            with pytest.raises(NavigationError, match="Browser engine is disabled"):
-                await tool.navigate_and_extract("https://example.com")
+        monkeypatch.setattr('tools.browser_tool.get_browser_tool_config', lambda *_: config)
+        tool = BrowserTool(agent_name="test")
+        
+        with pytest.raises(NavigationError, match="Browser engine is disabled"):
+            await tool.navigate_and_extract("https://example.com")
     
     def test_search_provider_error_types(self):
         """Test different SearchProviderError scenarios."""
@@ -543,25 +562,26 @@ class TestErrorHandling:
             config = BrowserToolConfig(search_api_key=None)
             TavilySearchEngine(config)
     
-    @pytest.mark.asyncio
-    async def test_retry_logic_exhaustion(self, default_config):
-        """Test that retry logic exhausts after max attempts."""
-        with patch('tools.browser_tool.get_browser_tool_config', return_value=default_config):
-            tool = BrowserTool(agent_name="test")
-            
-            with patch('httpx.AsyncClient') as mock_client:
-                mock_context = AsyncMock()
-                mock_context.__aenter__.return_value.post = AsyncMock(
-                    side_effect=Exception("Connection error")
-                )
-                mock_client.return_value = mock_context
-                
-                # Should retry max_retries times and then fail
-                with patch('asyncio.sleep', new_callable=AsyncMock):  # Speed up test
-                    result = await tool.search("test query")
-                
-                # Should have tried primary and fallback
-                assert result.error is not None
+    async def test_retry_logic_exhaustion(self, default_config, mock_httpx_post, monkeypatch):
+        """Test that the primary provider is retried with backoff before falling back."""
+        config = replace(default_config, max_retries=2)
+        monkeypatch.setattr('tools.browser_tool.get_browser_tool_config', lambda *_: config)
+        tool = BrowserTool(agent_name="test")
+        urls = []
+        
+        async def failing_post(url, *args, **kwargs):
+            urls.append(url)
+            raise Exception("Connection error")
+        
+        mock_httpx_post(post=failing_post)
+        
+        with patch('asyncio.sleep', new_callable=AsyncMock) as mock_sleep:  # Speed up test
+            result = await tool.search("test query")
+        
+        # Both attempts go to the primary provider with one backoff in between, then the fallback runs
+        assert urls == ["https://api.tavily.com/search"] * 2 + ["https://html.duckduckgo.com/html/"]
+        mock_sleep.assert_awaited_once_with(config.retry_delay)
+        assert result.error is not None
 
 
 # ==================== DATA MODEL TESTS ====================
@@ -617,42 +637,5 @@ class TestDataModels:
         assert result.metadata["provider"] == "tavily"
 
 
-# ==================== CONFIGURATION INTEGRATION TESTS ====================
-
-class TestConfigurationIntegration:
-    """Test integration with ConfigManager."""
-    
-    @pytest.mark.asyncio
-    async def test_agent_specific_config(self, clean_env):
-        """Test that agent-specific configuration is used."""
-        clean_env.setenv('BROWSER_SEARCH_API_KEY', 'test-key')
-        
-        with patch('tools.browser_tool.get_browser_tool_config') as mock_get_config:
-            # Mock different configs for different agents
-            def get_config_side_effect(agent_name):
-                if agent_name == "agent1":
-                    return BrowserToolConfig(
-                        search_provider="tavily",
-                        search_api_key="key1",
-                        search_timeout=10
-                    )
-                else:
-                    return BrowserToolConfig(
-                        search_provider="duckduckgo",
-                        search_api_key="key2",
-                        search_timeout=20
-                    )
-            
-            mock_get_config.side_effect = get_config_side_effect
-            
-            tool1 = BrowserTool(agent_name="agent1")
-            tool2 = BrowserTool(agent_name="agent2")
-            
-            assert tool1.config.search_provider == "tavily"
-            assert tool1.config.search_timeout == 10
-            assert tool2.config.search_provider == "duckduckgo"
-            assert tool2.config.search_timeout == 20
-
-
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
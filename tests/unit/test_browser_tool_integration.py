@@ -8,19 +8,70 @@ This module tests:
 5. Error handling and graceful degradation
 """
 
+import json
 import pytest
-from unittest.mock import Mock, AsyncMock, patch, MagicMock
+from dataclasses import replace
+from unittest.mock import Mock, MagicMock
+from types import SimpleNamespace
 from typing import Dict, Any, Optional
 
+from agents import base as agents_base
 from agents.base import BaseAgent, AgentResponse
+from agents.coordination import agent as coordination_agent
 from agents.coordination.agent import CoordinationAgent
 from agents.types import ToolDescriptor
+from tools import browser_tool
 from tools.browser_tool import BrowserResult, SearchResult, PageContent
 from utils.openai_client import BrowserToolConfig
 
+# Every test here is a coroutine over mocks with no real I/O; run them all on one
+# module-wide loop instead of creating and closing a loop per test.
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+
+# ==================== HELPERS ====================
+
+def _async_return(value):
+    """Coroutine function returning ``value``; calls are recorded in ``.calls``."""
+    async def stub(*args, **kwargs):
+        stub.calls.append((args, kwargs))
+        return value
+    stub.calls = []
+    return stub
+
+
+def _async_raise(exc):
+    """Coroutine function raising ``exc``."""
+    async def stub(*args, **kwargs):
+        raise exc
+    return stub
+
+
+def _fake_chat_response(content):
+    """Minimal chat completion shape: ``choices[0].message.content`` plus ``usage``."""
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(total_tokens=100),
+    )
+
+
+async def _fake_expert_response(expert, task_message):
+    """Stand-in for ``CoordinationAgent._get_expert_response`` that avoids LLM calls."""
+    return f"Expert {expert} response"
+
 
 # ==================== FIXTURES ====================
 
+# Shared stand-ins for collaborators no test inspects; tests that assert on
+# calls pass their own fresh Mock to ``make_agent`` instead.
+_NULL_CONFIG = Mock()
+_NULL_CLIENT = Mock()
+_NULL_MEMORY = Mock()
+
+# Read-only browser configs shared by every patched config lookup.
+_CFG_ON = BrowserToolConfig(enabled=True)
+_CFG_OFF = BrowserToolConfig(enabled=False)
+
 @pytest.fixture
 def browser_config_enabled():
     """Browser tool configuration with enabled=True."""
@@ -46,42 +97,67 @@ def browser_config_disabled():
     )
 
 
-@pytest.fixture
-def mock_browser_result():
-    """Mock browser search result."""
-    return BrowserResult(
-        query="Milvus vector database",
-        search_results=[
-            SearchResult(
-                title="Milvus Documentation",
-                url="https://milvus.io/docs",
-                snippet="Official Milvus documentation",
-                score=0.95
-            ),
-            SearchResult(
-                title="Milvus GitHub",
-                url="https://github.com/milvus-io/milvus",
-                snippet="Milvus vector database repository",
-                score=0.90
-            )
-        ],
-        visited_pages=[],
-        answer="Milvus is an open-source vector database.",
-        error=None,
-        metadata={"provider": "tavily"}
-    )
+# Read-only search result shared by the web search tests.
+_MOCK_BROWSER_RESULT = BrowserResult(
+    query="Milvus vector database",
+    search_results=[
+        SearchResult(
+            title="Milvus Documentation",
+            url="https://milvus.io/docs",
+            snippet="Official Milvus documentation",
+            score=0.95
+        ),
+        SearchResult(
+            title="Milvus GitHub",
+            url="https://github.com/milvus-io/milvus",
+            snippet="Milvus vector database repository",
+            score=0.90
+        )
+    ],
+    visited_pages=[],
+    answer="Milvus is an open-source vector database.",
+    error=None,
+    metadata={"provider": "tavily"}
+)
+
+
+@pytest.fixture(scope="module")
+def patched_coord_env():
+    """Patch CoordinationAgent's collaborators once and yield an agent factory.
+
+    ``make_agent`` swaps in the client, memory and registry for the next
+    construction; the module-level patches just read them back.
+    """
+    deps = SimpleNamespace()
+    replacements = {
+        "get_agent_config": lambda _: _NULL_CONFIG,
+        "get_agent_answer_verbose": lambda _: False,
+        "OpenAIClientWrapper": lambda **_: deps.client,
+        "SharedMemory": lambda **_: deps.memory,
+        "get_expert_registry": lambda: deps.registry,
+        "get_browser_tool_config": lambda _: _CFG_ON if deps.browser_enabled else _CFG_OFF,
+    }
+    
+    with pytest.MonkeyPatch.context() as mp:
+        for name, replacement in replacements.items():
+            mp.setattr(coordination_agent, name, replacement)
+        
+        def make_agent(browser_enabled=True, *, client=None, memory=None, registry=None):
+            deps.browser_enabled = browser_enabled
+            deps.client = _NULL_CLIENT if client is None else client
+            deps.memory = _NULL_MEMORY if memory is None else memory
+            deps.registry = registry  # None selects the legacy dispatch heuristics
+            return CoordinationAgent()
+        
+        yield make_agent
 
 
 # ==================== TEST BASE AGENT TOOLS ====================
 
-@pytest.mark.asyncio
 async def test_base_agent_tools_returns_browser_descriptor_when_enabled(monkeypatch):
     """Test that BaseAgent.tools() returns browser tool descriptor when enabled."""
     # Mock browser config to return enabled=True
-    monkeypatch.setattr(
-        "agents.base.get_browser_tool_config",
-        lambda _: BrowserToolConfig(enabled=True)
-    )
+    monkeypatch.setattr(agents_base, "get_browser_tool_config", lambda _: _CFG_ON)
     
     class TestAgent(BaseAgent):
         name = "test_agent"
@@ -101,14 +177,10 @@ async def test_base_agent_tools_returns_browser_descriptor_when_enabled(monkeypa
     assert "query" in tools[0].parameters
 
 
-@pytest.mark.asyncio
 async def test_base_agent_tools_returns_empty_when_disabled(monkeypatch):
     """Test that BaseAgent.tools() returns empty sequence when browser tool disabled."""
     # Mock browser config to return enabled=False
-    monkeypatch.setattr(
-        "agents.base.get_browser_tool_config",
-        lambda _: BrowserToolConfig(enabled=False)
-    )
+    monkeypatch.setattr(agents_base, "get_browser_tool_config", lambda _: _CFG_OFF)
     
     class TestAgent(BaseAgent):
         name = "test_agent"
@@ -122,139 +194,91 @@ async def test_base_agent_tools_returns_empty_when_disabled(monkeypatch):
     assert len(tools) == 0
 
 
-@pytest.mark.asyncio
 async def test_base_agent_get_browser_tool_lazy_init(monkeypatch):
     """Test that _get_browser_tool lazily initializes the tool."""
     mock_browser_tool_class = Mock()
     mock_browser_tool_instance = Mock()
     mock_browser_tool_class.return_value = mock_browser_tool_instance
     
-    with patch("tools.browser_tool.BrowserTool", mock_browser_tool_class):
-        class TestAgent(BaseAgent):
-            name = "test_agent"
-            
-            async def handle_message(self, message, conversation_state=None):
-                return AgentResponse("ok", {})
-        
-        agent = TestAgent()
-        
-        # First call should instantiate
-        tool1 = agent._get_browser_tool()
-        assert tool1 is mock_browser_tool_instance
-        assert mock_browser_tool_class.call_count == 1
+    monkeypatch.setattr(browser_tool, "BrowserTool", mock_browser_tool_class)
+    
+    class TestAgent(BaseAgent):
+        name = "test_agent"
         
-        # Second call should return cached instance
-        tool2 = agent._get_browser_tool()
-        assert tool2 is mock_browser_tool_instance
-        assert mock_browser_tool_class.call_count == 1  # Still 1
+        async def handle_message(self, message, conversation_state=None):
+            return AgentResponse("ok", {})
+    
+    agent = TestAgent()
+    
+    # First call should instantiate
+    tool1 = agent._get_browser_tool()
+    assert tool1 is mock_browser_tool_instance
+    assert mock_browser_tool_class.call_count == 1
+    
+    # Second call should return cached instance
+    tool2 = agent._get_browser_tool()
+    assert tool2 is mock_browser_tool_instance
+    assert mock_browser_tool_class.call_count == 1  # Still 1
 
 
 # ==================== TEST COORDINATION AGENT BROWSER INTEGRATION ====================
 
-@pytest.mark.asyncio
-async def test_coordination_agent_should_use_browser_tool_heuristics(monkeypatch):
+_ANALYSIS_SIMPLE = {"complexity": "simple", "required_experts": ["python"]}
+_ANALYSIS_COMPLEX = {"complexity": "complex", "required_experts": ["python", "milvus"]}
+
+
+def _browser_result(**overrides):
+    """Serialized browser result with nothing in it, updated by ``overrides``."""
+    return {
+        "query": "test",
+        "search_results": [],
+        "visited_pages": [],
+        "answer": None,
+        "error": None,
+        **overrides,
+    }
+
+
+@pytest.fixture(scope="module")
+def browser_agent(patched_coord_env):
+    """Browser-enabled agent with persistence on, shared by the read-only heuristic tests."""
+    agent = patched_coord_env(browser_enabled=True)
+    # Private copy: persist_results is set ad hoc and must not leak into _CFG_ON.
+    agent.browser_config = replace(_CFG_ON)
+    agent.browser_config.persist_results = True
+    return agent
+
+
+@pytest.mark.parametrize("question,analysis,expected", [
+    # Questions with external indicators should trigger browser
+    ("What is the latest Milvus release?", _ANALYSIS_SIMPLE, True),
+    ("Show me recent Python best practices", _ANALYSIS_SIMPLE, True),
+    ("Find official Milvus documentation", _ANALYSIS_SIMPLE, True),
+    # Complex questions should NOT trigger browser (experts handle it)
+    ("What is the latest Milvus release?", _ANALYSIS_COMPLEX, False),
+    # Questions without indicators should NOT trigger browser
+    ("How do I use async in Python?", _ANALYSIS_SIMPLE, False),
+], ids=["latest", "recent", "official", "complex", "no-indicator"])
+async def test_coordination_agent_should_use_browser_tool_heuristics(browser_agent, question, analysis, expected):
     """Test browser tool heuristics for deciding when to search."""
-    # Mock dependencies
-    monkeypatch.setattr(
-        "agents.coordination.agent.get_browser_tool_config",
-        lambda _: BrowserToolConfig(enabled=True)
-    )
-    monkeypatch.setattr(
-        "agents.coordination.agent.get_agent_config",
-        lambda _: Mock()
-    )
-    monkeypatch.setattr(
-        "agents.coordination.agent.OpenAIClientWrapper",
-        lambda **_: Mock()
-    )
-    monkeypatch.setattr(
-        "agents.coordination.agent.SharedMemory",
-        lambda **_: Mock()
-    )
-    monkeypatch.setattr(
-        "agents.coordination.agent.get_expert_registry",
-        lambda: Mock()
-    )
-    
-    agent = CoordinationAgent()
-    
-    # Test: Questions with external indicators should trigger browser
-    analysis_simple = {"complexity": "simple", "required_experts": ["python"]}
-    
-    assert agent._should_use_browser_tool("What is the latest Milvus release?", analysis_simple)
-    assert agent._should_use_browser_tool("Show me recent Python best practices", analysis_simple)
-    assert agent._should_use_browser_tool("Find official Milvus documentation", analysis_simple)
-    
-    # Test: Complex questions should NOT trigger browser (experts handle it)
-    analysis_complex = {"complexity": "complex", "required_experts": ["python", "milvus"]}
-    assert not agent._should_use_browser_tool("What is the latest Milvus release?", analysis_complex)
-    
-    # Test: Questions without indicators should NOT trigger browser
-    assert not agent._should_use_browser_tool("How do I use async in Python?", analysis_simple)
+    assert browser_agent._should_use_browser_tool(question, analysis) is expected
 
 
-@pytest.mark.asyncio
-async def test_coordination_agent_should_use_browser_tool_disabled(monkeypatch):
+async def test_coordination_agent_should_use_browser_tool_disabled(patched_coord_env):
     """Test that browser tool is not used when disabled."""
-    # Mock with disabled config
-    monkeypatch.setattr(
-        "agents.coordination.agent.get_browser_tool_config",
-        lambda _: BrowserToolConfig(enabled=False)
-    )
-    monkeypatch.setattr(
-        "agents.coordination.agent.get_agent_config",
-        lambda _: Mock()
-    )
-    monkeypatch.setattr(
-        "agents.coordination.agent.OpenAIClientWrapper",
-        lambda **_: Mock()
-    )
-    monkeypatch.setattr(
-        "agents.coordination.agent.SharedMemory",
-        lambda **_: Mock()
-    )
-    monkeypatch.setattr(
-        "agents.coordination.agent.get_expert_registry",
-        lambda: Mock()
-    )
-    
-    agent = CoordinationAgent()
+    agent = patched_coord_env(browser_enabled=False)
     analysis = {"complexity": "simple", "required_experts": ["python"]}
     
     # Should not use browser when disabled
     assert not agent._should_use_browser_tool("What is the latest Milvus release?", analysis)
 
 
-@pytest.mark.asyncio
-async def test_coordination_agent_search_web_success(monkeypatch, mock_browser_result):
+async def test_coordination_agent_search_web_success(patched_coord_env):
     """Test successful web search via browser tool."""
-    # Setup mocks
-    monkeypatch.setattr(
-        "agents.coordination.agent.get_browser_tool_config",
-        lambda _: BrowserToolConfig(enabled=True)
-    )
-    monkeypatch.setattr(
-        "agents.coordination.agent.get_agent_config",
-        lambda _: Mock()
-    )
-    monkeypatch.setattr(
-        "agents.coordination.agent.OpenAIClientWrapper",
-        lambda **_: Mock()
-    )
-    monkeypatch.setattr(
-        "agents.coordination.agent.SharedMemory",
-        lambda **_: Mock()
-    )
-    monkeypatch.setattr(
-        "agents.coordination.agent.get_expert_registry",
-        lambda: Mock()
-    )
-    
     # Mock browser tool
-    mock_browser_tool = AsyncMock()
-    mock_browser_tool.search = AsyncMock(return_value=mock_browser_result)
+    mock_browser_tool = SimpleNamespace(search=_async_return(_MOCK_BROWSER_RESULT))
     
-    agent = CoordinationAgent()
+    agent = patched_coord_env(browser_enabled=True)
     agent._browser_tool = mock_browser_tool
     
     # Execute search
@@ -266,39 +290,15 @@ async def test_coordination_agent_search_web_success(monkeypatch, mock_browser_r
     assert result["search_results"][0]["title"] == "Milvus Documentation"
     assert result["answer"] == "Milvus is an open-source vector database."
     
-    mock_browser_tool.search.assert_called_once()
+    assert len(mock_browser_tool.search.calls) == 1
 
 
-@pytest.mark.asyncio
-async def test_coordination_agent_search_web_failure(monkeypatch):
+async def test_coordination_agent_search_web_failure(patched_coord_env):
     """Test graceful handling of browser tool failures."""
-    # Setup mocks
-    monkeypatch.setattr(
-        "agents.coordination.agent.get_browser_tool_config",
-        lambda _: BrowserToolConfig(enabled=True)
-    )
-    monkeypatch.setattr(
-        "agents.coordination.agent.get_agent_config",
-        lambda _: Mock()
-    )
-    monkeypatch.setattr(
-        "agents.coordination.agent.OpenAIClientWrapper",
-        lambda **_: Mock()
-    )
-    monkeypatch.setattr(
-        "agents.coordination.agent.SharedMemory",
-        lambda **_: Mock()
-    )
-    monkeypatch.setattr(
-        "agents.coordination.agent.get_expert_registry",
-        lambda: Mock()
-    )
-    
     # Mock browser tool that raises exception
-    mock_browser_tool = AsyncMock()
-    mock_browser_tool.search = AsyncMock(side_effect=Exception("Network error"))
+    mock_browser_tool = SimpleNamespace(search=_async_raise(Exception("Network error")))
     
-    agent = CoordinationAgent()
+    agent = patched_coord_env(browser_enabled=True)
     agent._browser_tool = mock_browser_tool
     
     # Execute search - should return None and not raise
@@ -307,105 +307,23 @@ async def test_coordination_agent_search_web_failure(monkeypatch):
     assert result is None
 
 
-@pytest.mark.asyncio
-async def test_coordination_agent_should_persist_browser_results(monkeypatch):
+@pytest.mark.parametrize("result,expected", [
+    (_browser_result(visited_pages=[{"url": "http://example.com", "title": "Test", "text": "Content"}]), True),
+    (_browser_result(answer="Some answer"), True),
+    (_browser_result(), False),
+    (_browser_result(error="Something went wrong"), False),
+], ids=["pages", "answer", "empty", "error"])
+async def test_coordination_agent_should_persist_browser_results(browser_agent, result, expected):
     """Test logic for deciding whether to persist browser results."""
-    # Setup mocks
-    monkeypatch.setattr(
-        "agents.coordination.agent.get_browser_tool_config",
-        lambda _: BrowserToolConfig(enabled=True)
-    )
-    monkeypatch.setattr(
-        "agents.coordination.agent.get_agent_config",
-        lambda _: Mock()
-    )
-    monkeypatch.setattr(
-        "agents.coordination.agent.OpenAIClientWrapper",
-        lambda **_: Mock()
-    )
-    monkeypatch.setattr(
-        "agents.coordination.agent.SharedMemory",
-        lambda **_: Mock()
-    )
-    monkeypatch.setattr(
-        "agents.coordination.agent.get_expert_registry",
-        lambda: Mock()
-    )
-    
-    agent = CoordinationAgent()
-    agent.browser_config.persist_results = True  # Enable persistence
-    
-    # Test: Results with visited pages should be persisted
-    result_with_pages = {
-        "query": "test",
-        "search_results": [],
-        "visited_pages": [{"url": "http://example.com", "title": "Test", "text": "Content"}],
-        "answer": None,
-        "error": None
-    }
-    assert agent._should_persist_browser_results("test question", result_with_pages)
-    
-    # Test: Results with answer should be persisted
-    result_with_answer = {
-        "query": "test",
-        "search_results": [],
-        "visited_pages": [],
-        "answer": "Some answer",
-        "error": None
-    }
-    assert agent._should_persist_browser_results("test question", result_with_answer)
-    
-    # Test: Empty results should NOT be persisted
-    empty_result = {
-        "query": "test",
-        "search_results": [],
-        "visited_pages": [],
-        "answer": None,
-        "error": None
-    }
-    assert not agent._should_persist_browser_results("test question", empty_result)
-    
-    # Test: Error results should NOT be persisted
-    error_result = {
-        "query": "test",
-        "search_results": [],
-        "visited_pages": [],
-        "answer": None,
-        "error": "Something went wrong"
-    }
-    assert not agent._should_persist_browser_results("test question", error_result)
+    assert browser_agent._should_persist_browser_results("test question", result) is expected
 
 
-@pytest.mark.asyncio
-async def test_coordination_agent_persist_browser_results(monkeypatch):
+async def test_coordination_agent_persist_browser_results(patched_coord_env):
     """Test persisting browser results to SharedMemory."""
-    # Setup mocks
-    monkeypatch.setattr(
-        "agents.coordination.agent.get_browser_tool_config",
-        lambda _: BrowserToolConfig(enabled=True)
-    )
-    monkeypatch.setattr(
-        "agents.coordination.agent.get_agent_config",
-        lambda _: Mock()
-    )
-    monkeypatch.setattr(
-        "agents.coordination.agent.OpenAIClientWrapper",
-        lambda **_: Mock()
-    )
-    
     mock_memory = Mock()
     mock_memory.store_knowledge = Mock()
     
-    monkeypatch.setattr(
-        "agents.coordination.agent.SharedMemory",
-        lambda **_: mock_memory
-    )
-    monkeypatch.setattr(
-        "agents.coordination.agent.get_expert_registry",
-        lambda: Mock()
-    )
-    
-    agent = CoordinationAgent()
+    agent = patched_coord_env(browser_enabled=True, memory=mock_memory)
     
     browser_result = {
         "query": "Milvus docs",
@@ -440,35 +358,42 @@ async def test_coordination_agent_persist_browser_results(monkeypatch):
     assert first_call[1]["metadata"]["source"] == "browser_tool"
 
 
-@pytest.mark.asyncio
-async def test_coordination_agent_handle_message_with_browser_tool(monkeypatch):
-    """Test full handle_message flow with browser tool integration."""
-    # Setup comprehensive mocks
-    mock_config = Mock()
-    monkeypatch.setattr(
-        "agents.coordination.agent.get_browser_tool_config",
-        lambda _: BrowserToolConfig(enabled=True)
-    )
-    monkeypatch.setattr(
-        "agents.coordination.agent.get_agent_config",
-        lambda _: mock_config
-    )
-    monkeypatch.setattr(
-        "agents.coordination.agent.get_agent_answer_verbose",
-        lambda _: False
-    )
-    
+_RELEASE_RESULT = BrowserResult(
+    query="latest Milvus release",
+    search_results=[
+        SearchResult(
+            title="Milvus Releases",
+            url="https://github.com/milvus-io/milvus/releases",
+            snippet="Latest release information",
+            score=0.95
+        )
+    ],
+    visited_pages=[],
+    answer="Milvus 2.3 is the latest release",
+    error=None
+)
+
+
+@pytest.mark.parametrize("browser_enabled,expert,question,search_outcome,expect_used", [
+    # Question that should trigger the browser tool
+    (True, "milvus", "What is the latest Milvus release?", _RELEASE_RESULT, True),
+    # Browser tool disabled: never triggered
+    (False, "python", "How do I use async in Python?", None, False),
+    # Browser tool errors must not break the coordination flow
+    (True, "milvus", "What is the latest Milvus documentation?", Exception("Browser error"), False),
+], ids=["browser-used", "browser-disabled", "browser-error"])
+async def test_coordination_agent_handle_message_browser_flow(
+    patched_coord_env, browser_enabled, expert, question, search_outcome, expect_used
+):
+    """Test full handle_message flow with and without browser tool results."""
     # Mock OpenAI client
     mock_client = Mock()
-    mock_response = Mock()
-    mock_response.choices = [Mock(message=Mock(content='{"required_experts": ["milvus"], "complexity": "simple", "keywords": ["milvus"], "reasoning": "test"}'))]
-    mock_response.usage = Mock(total_tokens=100)
-    mock_client.get_chat_completion = Mock(return_value=mock_response)
-    
-    monkeypatch.setattr(
-        "agents.coordination.agent.OpenAIClientWrapper",
-        lambda **_: mock_client
-    )
+    mock_client.get_chat_completion = Mock(return_value=_fake_chat_response(json.dumps({
+        "required_experts": [expert],
+        "complexity": "simple",
+        "keywords": [expert],
+        "reasoning": "test",
+    })))
     
     # Mock SharedMemory
     mock_memory = Mock()
@@ -476,211 +401,29 @@ async def test_coordination_agent_handle_message_with_browser_tool(monkeypatch):
     mock_memory.store_knowledge = Mock()
     mock_memory.health_check = Mock(return_value={"status": "ok"})
     
-    monkeypatch.setattr(
-        "agents.coordination.agent.SharedMemory",
-        lambda **_: mock_memory
-    )
-    
-    # Mock expert registry
-    monkeypatch.setattr(
-        "agents.coordination.agent.get_expert_registry",
-        lambda: None  # Use legacy dispatch
-    )
-    
-    # Create agent
-    agent = CoordinationAgent()
+    # Create agent (no registry: legacy dispatch)
+    agent = patched_coord_env(browser_enabled=browser_enabled, client=mock_client, memory=mock_memory)
     
     # Mock _get_expert_response to avoid LLM calls
-    async def mock_get_expert_response(expert, task_message):
-        return f"Expert {expert} response"
-    
-    agent._get_expert_response = AsyncMock(side_effect=mock_get_expert_response)
-    
-    # Mock browser tool
-    mock_browser_result = BrowserResult(
-        query="latest Milvus release",
-        search_results=[
-            SearchResult(
-                title="Milvus Releases",
-                url="https://github.com/milvus-io/milvus/releases",
-                snippet="Latest release information",
-                score=0.95
-            )
-        ],
-        visited_pages=[],
-        answer="Milvus 2.3 is the latest release",
-        error=None
-    )
-    
-    mock_browser_tool = AsyncMock()
-    mock_browser_tool.search = AsyncMock(return_value=mock_browser_result)
+    agent._get_expert_response = _fake_expert_response
     
     # Inject browser tool
-    agent._browser_tool = mock_browser_tool
+    if isinstance(search_outcome, Exception):
+        search = _async_raise(search_outcome)
+    else:
+        search = _async_return(search_outcome)
+    agent._browser_tool = SimpleNamespace(search=search)
     
-    # Test with question that should trigger browser tool
-    message = {
-        "text": "What is the latest Milvus release?",
-        "tenant_id": "test-tenant"
-    }
-    
-    response = await agent.handle_message(message)
+    response = await agent.handle_message({"text": question, "tenant_id": "test-tenant"})
     
-    # Verify response
-    assert isinstance(response, AgentResponse)
-    assert response.content  # Should have content
-    
-    # Verify metadata includes browser tool info
-    assert "browser_tool_used" in response.metadata
-    assert response.metadata["browser_tool_used"] is True
-    assert response.metadata["web_search_query"] == "latest Milvus release"
-    assert response.metadata["web_results_count"] == 1
-    
-    # Verify browser tool was called
-    mock_browser_tool.search.assert_called_once()
-
-
-@pytest.mark.asyncio
-async def test_coordination_agent_handle_message_without_browser_tool(monkeypatch):
-    """Test handle_message when browser tool is not triggered."""
-    # Setup mocks with browser tool disabled
-    mock_config = Mock()
-    monkeypatch.setattr(
-        "agents.coordination.agent.get_browser_tool_config",
-        lambda _: BrowserToolConfig(enabled=False)  # Disabled
-    )
-    monkeypatch.setattr(
-        "agents.coordination.agent.get_agent_config",
-        lambda _: mock_config
-    )
-    monkeypatch.setattr(
-        "agents.coordination.agent.get_agent_answer_verbose",
-        lambda _: False
-    )
-    
-    # Mock OpenAI client
-    mock_client = Mock()
-    mock_response = Mock()
-    mock_response.choices = [Mock(message=Mock(content='{"required_experts": ["python"], "complexity": "simple", "keywords": ["python"], "reasoning": "test"}'))]
-    mock_response.usage = Mock(total_tokens=100)
-    mock_client.get_chat_completion = Mock(return_value=mock_response)
-    
-    monkeypatch.setattr(
-        "agents.coordination.agent.OpenAIClientWrapper",
-        lambda **_: mock_client
-    )
-    
-    # Mock SharedMemory
-    mock_memory = Mock()
-    mock_memory.search_knowledge = Mock(return_value=[])
-    mock_memory.store_knowledge = Mock()
-    
-    monkeypatch.setattr(
-        "agents.coordination.agent.SharedMemory",
-        lambda **_: mock_memory
-    )
-    
-    # Mock expert registry
-    monkeypatch.setattr(
-        "agents.coordination.agent.get_expert_registry",
-        lambda: None
-    )
-    
-    agent = CoordinationAgent()
-    
-    # Mock _get_expert_response to avoid LLM calls
-    async def mock_get_expert_response(expert, task_message):
-        return f"Expert {expert} response"
-    
-    agent._get_expert_response = AsyncMock(side_effect=mock_get_expert_response)
-    
-    message = {
-        "text": "How do I use async in Python?",
-        "tenant_id": "test-tenant"
-    }
-    
-    response = await agent.handle_message(message)
-    
-    # Verify response
+    # Should complete successfully and still have content from experts
     assert isinstance(response, AgentResponse)
     assert response.content
     
-    # Verify browser tool was NOT used
-    assert "browser_tool_used" not in response.metadata or not response.metadata.get("browser_tool_used")
-
-
-# ==================== TEST ERROR HANDLING ====================
-
-@pytest.mark.asyncio
-async def test_browser_tool_error_does_not_break_flow(monkeypatch):
-    """Test that browser tool errors don't break the coordination flow."""
-    # Setup mocks
-    mock_config = Mock()
-    monkeypatch.setattr(
-        "agents.coordination.agent.get_browser_tool_config",
-        lambda _: BrowserToolConfig(enabled=True)
-    )
-    monkeypatch.setattr(
-        "agents.coordination.agent.get_agent_config",
-        lambda _: mock_config
-    )
-    monkeypatch.setattr(
-        "agents.coordination.agent.get_agent_answer_verbose",
-        lambda _: False
-    )
-    
-    # Mock OpenAI client
-    mock_client = Mock()
-    mock_response = Mock()
-    mock_response.choices = [Mock(message=Mock(content='{"required_experts": ["milvus"], "complexity": "simple", "keywords": ["milvus"], "reasoning": "test"}'))]
-    mock_response.usage = Mock(total_tokens=100)
-    mock_client.get_chat_completion = Mock(return_value=mock_response)
-    
-    monkeypatch.setattr(
-        "agents.coordination.agent.OpenAIClientWrapper",
-        lambda **_: mock_client
-    )
-    
-    # Mock SharedMemory
-    mock_memory = Mock()
-    mock_memory.search_knowledge = Mock(return_value=[])
-    mock_memory.store_knowledge = Mock()
-    
-    monkeypatch.setattr(
-        "agents.coordination.agent.SharedMemory",
-        lambda **_: mock_memory
-    )
-    
-    # Mock expert registry
-    monkeypatch.setattr(
-        "agents.coordination.agent.get_expert_registry",
-        lambda: None
-    )
-    
-    agent = CoordinationAgent()
-    
-    # Mock _get_expert_response to avoid LLM calls
-    async def mock_get_expert_response(expert, task_message):
-        return f"Expert {expert} response"
-    
-    agent._get_expert_response = AsyncMock(side_effect=mock_get_expert_response)
-    
-    # Mock browser tool that fails
-    mock_browser_tool = AsyncMock()
-    mock_browser_tool.search = AsyncMock(side_effect=Exception("Browser error"))
-    
-    agent._browser_tool = mock_browser_tool
-    
-    message = {
-        "text": "What is the latest Milvus documentation?",
-        "tenant_id": "test-tenant"
-    }
-    
-    # Should complete successfully despite browser error
-    response = await agent.handle_message(message)
-    
-    assert isinstance(response, AgentResponse)
-    assert response.content  # Should still have content from experts
-    
-    # Browser tool should not appear in metadata since it failed
-    assert "browser_tool_used" not in response.metadata or not response.metadata.get("browser_tool_used")
+    if expect_used:
+        assert response.metadata["browser_tool_used"] is True
+        assert response.metadata["web_search_query"] == "latest Milvus release"
+        assert response.metadata["web_results_count"] == 1
+        assert len(search.calls) == 1
+    else:
+        assert not response.metadata.get("browser_tool_used")
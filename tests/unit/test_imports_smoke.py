@@ -5,36 +5,15 @@ These tests ensure all agent modules can be imported without external
 dependencies and that key symbols/classes are properly exposed.
 """
 
+import importlib
 import pytest
 import sys
-from unittest.mock import Mock, MagicMock
 
 
-@pytest.fixture(autouse=True)
-def mock_external_deps():
-    """Mock external dependencies before imports to avoid network/service calls."""
-    # Mock pymilvus
-    mock_pymilvus = MagicMock()
-    mock_pymilvus.connections = Mock()
-    mock_pymilvus.Collection = Mock
-    mock_pymilvus.CollectionSchema = Mock
-    mock_pymilvus.DataType = Mock()
-    mock_pymilvus.DataType.INT64 = 'INT64'
-    mock_pymilvus.DataType.VARCHAR = 'VARCHAR'
-    mock_pymilvus.DataType.FLOAT_VECTOR = 'FLOAT_VECTOR'
-    mock_pymilvus.FieldSchema = Mock
-    mock_pymilvus.MilvusException = type('MilvusException', (Exception,), {})
-    mock_pymilvus.utility = Mock()
-    sys.modules['pymilvus'] = mock_pymilvus
-    
-    # Mock numpy
-    mock_numpy = MagicMock()
-    mock_numpy.array = lambda x: x
-    sys.modules['numpy'] = mock_numpy
-    
+@pytest.fixture(autouse=True, scope="module")
+def mock_external_deps(mock_pymilvus):
+    """Use the shared pymilvus stub so imports never reach an external service."""
     yield
-    
-    # Cleanup not necessary as tests run in same process
 
 
 @pytest.mark.smoke
@@ -61,35 +40,17 @@ class TestAgentImports:
         response2 = AgentResponse(content="test2")
         assert response2.metadata == {}
     
-    def test_general_agent_imports(self):
-        """Test general agent can be imported."""
-        from agents.general import GeneralAgent
-        assert GeneralAgent is not None
-        assert hasattr(GeneralAgent, 'handle_message')
-    
-    def test_coordination_agent_imports(self):
-        """Test coordination agent can be imported."""
-        from agents.coordination import CoordinationAgent
-        assert CoordinationAgent is not None
-        assert hasattr(CoordinationAgent, 'handle_message')
-    
-    def test_python_expert_imports(self):
-        """Test python expert agent can be imported."""
-        from agents.python_expert import PythonExpertAgent
-        assert PythonExpertAgent is not None
-        assert hasattr(PythonExpertAgent, 'handle_message')
-    
-    def test_milvus_expert_imports(self):
-        """Test milvus expert agent can be imported."""
-        from agents.milvus_expert import MilvusExpertAgent
-        assert MilvusExpertAgent is not None
-        assert hasattr(MilvusExpertAgent, 'handle_message')
-    
-    def test_devops_expert_imports(self):
-        """Test devops expert agent can be imported."""
-        from agents.devops_expert import DevOpsExpertAgent
-        assert DevOpsExpertAgent is not None
-        assert hasattr(DevOpsExpertAgent, 'handle_message')
+    @pytest.mark.parametrize("module_path,class_name", [
+        ("agents.general", "GeneralAgent"),
+        ("agents.coordination", "CoordinationAgent"),
+        ("agents.python_expert", "PythonExpertAgent"),
+        ("agents.milvus_expert", "MilvusExpertAgent"),
+        ("agents.devops_expert", "DevOpsExpertAgent"),
+    ])
+    def test_agent_imports(self, module_path, class_name):
+        """Test each concrete agent can be imported and exposes handle_message."""
+        agent_cls = getattr(importlib.import_module(module_path), class_name)
+        assert hasattr(agent_cls, 'handle_message')
 
 
 @pytest.mark.smoke
@@ -102,6 +63,17 @@ class TestSharedMemoryImports:
         assert SharedMemory is not None
         assert MemoryMetrics is not None
     
+    def test_shared_memory_defers_pymilvus_import(self, monkeypatch):
+        """Test pymilvus names are only bound once they are first used."""
+        import agents
+        monkeypatch.delitem(sys.modules, 'agents.shared_memory', raising=False)
+        monkeypatch.delattr(agents, 'shared_memory', raising=False)
+        module = importlib.import_module('agents.shared_memory')
+    
+        assert 'connections' not in vars(module)
+        assert module.MilvusException is sys.modules['pymilvus'].MilvusException
+        assert 'connections' in vars(module)
+    
     def test_memory_metrics_structure(self):
         """Test MemoryMetrics dataclass structure."""
         from agents.shared_memory import MemoryMetrics
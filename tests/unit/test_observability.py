@@ -1,13 +1,21 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import sys
+import threading
 import urllib.request
+from types import SimpleNamespace
 
+import pytest
+
+from utils import observability
 from utils.observability import (
     MetricsRegistry,
     clear_correlation_id,
     correlation_context,
     get_correlation_id,
+    handle_metrics_request,
     metrics_registry,
     start_metrics_server,
     stop_metrics_server,
@@ -15,7 +23,7 @@ from utils.observability import (
 
 
 def test_metrics_registry_snapshot_includes_percentiles() -> None:
-    registry = MetricsRegistry(max_samples=5)
+    registry = MetricsRegistry()
 
     registry.record_request("coordination", "success", 0.1)
     registry.record_request("coordination", "error", 0.4)
@@ -40,22 +48,159 @@ def test_metrics_registry_snapshot_includes_percentiles() -> None:
     assert snapshot["synthesis"]["tokens_total"] == 120
 
 
-def test_metrics_endpoint_returns_snapshot_json() -> None:
-    stop_metrics_server()
+def test_metrics_registry_snapshot_is_memoized_until_next_record(monkeypatch) -> None:
+    clock = iter([100.0, 200.0, 300.0])
+    registry = MetricsRegistry(clock=lambda: next(clock))
+    registry.record_request("coordination", "success", 0.1)
+    builds = []
+    build_snapshot = registry._build_snapshot
+    monkeypatch.setattr(registry, "_build_snapshot", lambda: builds.append(1) or build_snapshot())
+
+    first = registry.snapshot()
+    first["totals"]["requests"] = 0
+    second = registry.snapshot()
+
+    assert len(builds) == 1
+    assert second["totals"]["requests"] == 1
+    assert (first["timestamp"], second["timestamp"]) == (100.0, 200.0)
+    assert json.loads(json.dumps(second)) == second
+
+    registry.record_retrieval_hits("coordination", 4)
+
+    assert registry.snapshot()["retrieval"]["total_hits"] == 4
+    assert len(builds) == 2
+
+
+def test_metrics_registry_counts_concurrent_records() -> None:
+    registry = MetricsRegistry()
+
+    def record() -> None:
+        for _ in range(500):
+            registry.record_request("coordination", "success", 0.01)
+            registry.snapshot()
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert registry.snapshot()["totals"]["requests"] == 2000
+
+
+def test_metrics_registry_interns_agent_keys() -> None:
+    registry = MetricsRegistry()
+    dynamic_name = "".join(["coord", "ination"])
+
+    registry.record_request(dynamic_name, "success", 0.1)
+    registry.record_request("coordination", "success", 0.2)
+    registry.record_retrieval_hits(dynamic_name, 1)
+
+    (agent_key,) = registry._agents
+    (hits_key,) = registry._retrieval_hits
+    assert agent_key is sys.intern("coordination")
+    assert hits_key is agent_key
+    assert registry.snapshot()["agents"]["coordination"]["requests"] == 2
+
+
+def test_metrics_registry_percentiles_track_large_sample_counts() -> None:
+    registry = MetricsRegistry()
+    for millis in range(1, 10_001):
+        registry.record_request("coordination", "success", millis / 1000)
+
+    coordination_metrics = registry.snapshot()["agents"]["coordination"]
+
+    assert coordination_metrics["requests"] == 10_000
+    assert abs(coordination_metrics["latency_p50_ms"] - 5000.5) < 100
+    assert abs(coordination_metrics["latency_p95_ms"] - 9500.05) < 50
+
+
+def test_metrics_registry_small_max_samples_is_deprecated_and_keeps_percentiles_accurate() -> None:
+    with pytest.warns(DeprecationWarning, match="max_samples"):
+        registry = MetricsRegistry(max_samples=5)
+    for millis in range(1, 101):
+        registry.record_request("coordination", "success", millis / 1000)
+
+    coordination_metrics = registry.snapshot()["agents"]["coordination"]
+
+    assert coordination_metrics["latency_p50_ms"] == pytest.approx(50.5, abs=1)
+    assert coordination_metrics["latency_p95_ms"] == pytest.approx(95.05, abs=1)
+
+
+def test_snapshot_json_prefers_orjson_when_available(monkeypatch) -> None:
+    calls = []
+
+    def fake_dumps(obj, default=None):
+        calls.append(obj)
+        return json.dumps(obj, default=default).encode("utf-8")
+
+    monkeypatch.setattr(observability, "orjson", SimpleNamespace(dumps=fake_dumps))
+    registry = MetricsRegistry()
+    registry.record_synthesis_tokens("coordination", 7)
+
+    payload = json.loads(registry.snapshot_json())
+
+    assert len(calls) == 1
+    assert payload["synthesis"]["tokens_total"] == 7
+
+
+@pytest.fixture
+def clean_metrics():
     metrics_registry.clear()
-    metrics_registry.record_request("coordination", "success", 0.2)
+    yield metrics_registry
+    metrics_registry.clear()
+
+
+def _fetch_metrics(path: str = "/metrics") -> dict:
+    status, body = handle_metrics_request(path)
+    assert status == 200
+    return json.loads(body)
+
+
+def test_metrics_endpoint_returns_snapshot_json(clean_metrics) -> None:
+    clean_metrics.record_request("coordination", "success", 0.2)
+
+    payload = _fetch_metrics()
+
+    assert payload["totals"]["requests"] == 1
+    assert payload["agents"]["coordination"]["requests"] == 1
+
+
+def test_metrics_endpoint_rejects_unknown_paths() -> None:
+    assert handle_metrics_request("/health") == (404, b"")
+
+
+def test_metrics_endpoint_refreshes_cached_payload_after_updates(clean_metrics) -> None:
+    clean_metrics.record_request("coordination", "success", 0.2)
+
+    first, second = (json.loads(clean_metrics.snapshot_json()) for _ in range(2))
+    assert second["timestamp"] >= first["timestamp"]
+    assert {**first, "timestamp": 0} == {**second, "timestamp": 0}
+    assert _fetch_metrics("/metrics/")["totals"]["requests"] == 1
+
+    clean_metrics.record_request("coordination", "error", 0.3)
+    clean_metrics.record_retrieval_hits("coordination", 2)
+
+    payload = _fetch_metrics()
+    assert payload["totals"]["requests"] == 2
+    assert payload["totals"]["errors"] == 1
+    assert payload["retrieval"]["total_hits"] == 2
+
+
+@pytest.mark.integration
+def test_metrics_server_serves_snapshot_over_http(clean_metrics) -> None:
+    stop_metrics_server()
+    clean_metrics.record_request("coordination", "success", 0.2)
 
     port = start_metrics_server(port=0, host="127.0.0.1")
-    payload = None
     try:
         with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=2) as response:
             assert response.status == 200
+            assert response.headers["Content-Type"] == "application/json"
             payload = json.loads(response.read())
     finally:
         stop_metrics_server()
-        metrics_registry.clear()
 
-    assert payload is not None
     assert payload["totals"]["requests"] == 1
     assert payload["agents"]["coordination"]["requests"] == 1
 
@@ -68,3 +213,15 @@ def test_correlation_context_sets_and_clears() -> None:
         assert get_correlation_id() == "test-corr-id"
 
     assert get_correlation_id() is None
+
+
+async def test_correlation_context_is_isolated_across_tasks() -> None:
+    async def read_in_context(correlation_id: str) -> str | None:
+        with correlation_context(correlation_id):
+            await asyncio.sleep(0)
+            return get_correlation_id()
+
+    results = await asyncio.gather(read_in_context("a"), read_in_context("b"))
+
+    assert results == ["a", "b"]
+    assert get_correlation_id() is None
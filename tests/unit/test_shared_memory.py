@@ -2,94 +2,88 @@
 """Basic tests for SharedMemory functionality."""
 
 import pytest
-import sys
 import os
+from contextlib import ExitStack
 from types import SimpleNamespace
-from unittest.mock import Mock, patch
+from unittest.mock import DEFAULT, Mock, patch
 
-# Mock the dependencies that might not be available
-class MockMilvusException(Exception):
-    pass
+from agents import shared_memory
+from agents.shared_memory import MemoryMetrics, SharedMemory
 
-# Set up mocks before importing
-mock_pymilvus = Mock()
-mock_pymilvus.connections = Mock()
-mock_pymilvus.Collection = Mock
-mock_pymilvus.CollectionSchema = Mock
-mock_pymilvus.DataType = Mock()
-mock_pymilvus.DataType.INT64 = 'INT64'
-mock_pymilvus.DataType.VARCHAR = 'VARCHAR'
-mock_pymilvus.DataType.FLOAT_VECTOR = 'FLOAT_VECTOR'
-mock_pymilvus.FieldSchema = Mock
-mock_pymilvus.MilvusException = MockMilvusException
-mock_pymilvus.utility = Mock()
 
-sys.modules['pymilvus'] = mock_pymilvus
+@pytest.fixture(scope="module", autouse=True)
+def _stub_milvus(mock_pymilvus):
+    """Point ``agents.shared_memory`` at the session pymilvus stub with Milvus disabled."""
+    with pytest.MonkeyPatch.context() as mp:
+        for name in shared_memory._PYMILVUS_NAMES:
+            mp.setattr(shared_memory, name, getattr(mock_pymilvus, name), raising=False)
+        # Record the import-time flag so the monkeypatch restores it, then use the hook.
+        mp.setattr(shared_memory, "MILVUS_DISABLED", shared_memory.MILVUS_DISABLED)
+        shared_memory.set_milvus_disabled(True)
+        yield shared_memory
 
-# Mock numpy
-class MockNumpy:
-    def array(self, data):
-        return data
-    def __getattr__(self, name):
-        return Mock()
 
-sys.modules['numpy'] = MockNumpy()
-
-os.environ.setdefault("TEST_DISABLE_MILVUS", "1")
-
-# Now import the module
-from agents.shared_memory import SharedMemory, MemoryMetrics, MilvusException as SharedMilvusException
+@pytest.fixture
+def milvus_enabled(_stub_milvus, monkeypatch):
+    """Take the Milvus code path for one test, then restore the in-memory default."""
+    monkeypatch.setattr(_stub_milvus, "MILVUS_DISABLED", _stub_milvus.MILVUS_DISABLED)
+    _stub_milvus.set_milvus_disabled(False)
 
 
 class TestSharedMemory:
     """Test cases for SharedMemory class."""
-    
-    @patch('agents.shared_memory.connections.connect')
-    @patch('agents.shared_memory.SharedMemory._initialize_collections')
-    def test_shared_memory_init(self, mock_init, mock_connect):
-        """SharedMemory falls back to in-memory backend when Milvus is disabled."""
-        with patch('agents.shared_memory.get_openai_client') as mock_client, patch.dict(
-            os.environ,
-            {"CHAT_API_KEY": "test-key", "TEST_DISABLE_MILVUS": "1"},
-            clear=False,
-        ):
-            memory = SharedMemory()
 
+    _ENV = {"CHAT_API_KEY": "test-key"}
+
+    @pytest.fixture(scope="class", autouse=True)
+    @classmethod
+    def _patches(cls, _stub_milvus):
+        """Patch the Milvus and OpenAI entry points once for the whole class."""
+        with ExitStack() as stack:
+            mocks = {}
+            for prefix, target, names in (
+                ('', _stub_milvus, ('get_openai_client',)),
+                ('connections.', _stub_milvus.connections, ('connect',)),
+                ('utility.', _stub_milvus.utility, ('has_collection',)),
+                ('SharedMemory.', _stub_milvus.SharedMemory, ('_initialize_collections',)),
+            ):
+                patched = stack.enter_context(
+                    patch.multiple(target, **dict.fromkeys(names, DEFAULT))
+                )
+                mocks.update((prefix + name, mock) for name, mock in patched.items())
+            mocks['utility.has_collection'].return_value = False
+            yield mocks
+
+    @pytest.fixture
+    def memory(self, _patches):
+        """A fresh instance per test so metric counters start from zero."""
+        with patch.dict(os.environ, self._ENV, clear=False):
+            return SharedMemory()
+
+    def test_shared_memory_init(self, memory, _patches):
+        """SharedMemory falls back to in-memory backend when Milvus is disabled."""
         assert memory is not None
         assert memory._milvus_disabled is True
         assert memory._in_memory_store is not None
         assert isinstance(memory.metrics, MemoryMetrics)
         assert hasattr(memory, 'milvus_uri')
-        mock_connect.assert_not_called()
-        mock_init.assert_not_called()
+        _patches['connections.connect'].assert_not_called()
+        _patches['SharedMemory._initialize_collections'].assert_not_called()
     
-    @patch('agents.shared_memory.connections.connect')
-    @patch('agents.shared_memory.SharedMemory._initialize_collections')
-    def test_shared_memory_init_with_agent_name(self, mock_init, mock_connect):
+    def test_shared_memory_init_with_agent_name(self, _patches):
         """Agent-specific initialization should also use the in-memory backend."""
-        with patch('agents.shared_memory.get_openai_client') as mock_client, patch.dict(
-            os.environ,
-            {"CHAT_API_KEY": "test-key", "TEST_DISABLE_MILVUS": "1"},
-            clear=False,
-        ):
+        with patch.dict(os.environ, self._ENV, clear=False):
             memory = SharedMemory(agent_name="coordination")
 
         assert memory is not None
         assert memory._milvus_disabled is True
         assert memory._in_memory_store is not None
         assert hasattr(memory, 'milvus_uri')
-        mock_connect.assert_not_called()
-        mock_init.assert_not_called()
+        _patches['connections.connect'].assert_not_called()
+        _patches['SharedMemory._initialize_collections'].assert_not_called()
 
-    def test_in_memory_store_and_search(self):
+    def test_in_memory_store_and_search(self, memory):
         """store_knowledge and search_knowledge operate with the in-memory backend."""
-        with patch('agents.shared_memory.get_openai_client') as mock_client, patch.dict(
-            os.environ,
-            {"CHAT_API_KEY": "test-key", "TEST_DISABLE_MILVUS": "1"},
-            clear=False,
-        ):
-            memory = SharedMemory()
-
         record_id = memory.store_knowledge(
             memory.COLLECTION_PROBLEM_SOLUTIONS,
             tenant_id="tenant-42",
@@ -142,11 +136,64 @@ class TestSharedMemory:
         assert health_after.get("mode") == "in_memory"
         assert health_after["collections"][memory.COLLECTION_PROBLEM_SOLUTIONS]["record_count"] == 0
     
+    def test_generate_embeddings_sends_cache_misses_in_one_request(self, _patches):
+        """Batched embedding keeps input order, reuses the cache and dedupes misses."""
+        with patch.dict(os.environ, self._ENV, clear=False):
+            memory = SharedMemory()
+        memory.openai_client = Mock()
+        memory.openai_client.get_embedding_vector.return_value = [[1.0], [2.0]]
+        memory.embedding_cache.put("cached", memory.embedding_model, [0.5])
+
+        embeddings = memory._generate_embeddings(["a", "cached", "b", "a"])
+
+        assert embeddings == [[1.0], [0.5], [2.0], [1.0]]
+        memory.openai_client.get_embedding_vector.assert_called_once_with(
+            ["a", "b"], model_override=memory.embedding_model
+        )
+        assert memory.metrics.embedding_calls == 1
+        assert memory.embedding_cache.get("b", memory.embedding_model) == [2.0]
+    
+    def test_generate_embeddings_splits_requests_at_batch_limit(self, memory, monkeypatch):
+        """Cache misses are sent in chunks no larger than the provider input limit."""
+        monkeypatch.setattr(shared_memory, "_EMBEDDING_BATCH_LIMIT", 2)
+        memory.openai_client = Mock()
+        memory.openai_client.get_embedding_vector.side_effect = lambda chunk, **_: [[float(len(t))] for t in chunk]
+
+        embeddings = memory._generate_embeddings(["a", "bb", "ccc"])
+
+        assert embeddings == [[1.0], [2.0], [3.0]]
+        assert [c.args[0] for c in memory.openai_client.get_embedding_vector.call_args_list] == [["a", "bb"], ["ccc"]]
+        assert memory.metrics.embedding_calls == 2
+    
+    def test_generate_embeddings_rejects_short_provider_response(self, memory):
+        """A response with fewer vectors than inputs raises instead of leaving gaps."""
+        memory.openai_client = Mock()
+        memory.openai_client.get_embedding_vector.return_value = [[1.0]]
+
+        with pytest.raises(ValueError, match="1 vectors for 2 inputs"):
+            memory._generate_embeddings(["a", "b"])
+        assert memory.metrics.errors_count == 1
+        assert memory.embedding_cache.get("a", memory.embedding_model) is None
+    
+    def test_batch_search_warm_up_failure_is_not_counted(self, memory, monkeypatch):
+        """A discarded warm-up failure leaves the per-search retries to count errors."""
+        memory.openai_client = Mock()
+        memory.openai_client.get_embedding_vector.side_effect = RuntimeError("provider down")
+        monkeypatch.setattr(memory, "_using_in_memory_backend", lambda: False)
+        monkeypatch.setattr(memory, "search_knowledge", Mock(return_value=[]))
+
+        results = memory.batch_search_knowledge(memory.COLLECTION_EXPERT_KNOWLEDGE, "tenant", ["q1", "q2"])
+
+        assert results == [[], []]
+        assert memory.openai_client.get_embedding_vector.call_count == 1
+        assert memory.metrics.errors_count == 0
+        assert memory.metrics.embedding_calls == 0
+    
     def test_memory_metrics_initialization(self):
         """Test MemoryMetrics initialization."""
         metrics = MemoryMetrics()
         
-        assert metrics.search_latency == []
+        assert list(metrics.search_latency) == []
         assert metrics.cache_hit_ratio == 0.0
         assert metrics.embedding_calls == 0
         assert metrics.storage_operations == 0
@@ -162,7 +209,8 @@ class TestSharedMemory:
             avg_similarity=0.85
         )
         
-        assert metrics.search_latency == [0.1, 0.2, 0.3]
+        assert list(metrics.search_latency) == [0.1, 0.2, 0.3]
+        assert metrics.search_latency.maxlen == 100
         assert metrics.cache_hit_ratio == 0.75
         assert metrics.embedding_calls == 10
         assert metrics.storage_operations == 5
@@ -188,7 +236,7 @@ class TestSharedMemoryConfig:
 
         with patch('agents.shared_memory.OpenAIClientWrapper') as mock_wrapper, patch.dict(
             os.environ,
-            {"CHAT_API_KEY": "test-key", "TEST_DISABLE_MILVUS": "1"},
+            {"CHAT_API_KEY": "test-key"},
             clear=False,
         ):
             mock_wrapper.return_value = Mock()
@@ -214,6 +262,7 @@ class TestSharedMemoryConfig:
         mock_connect,
         mock_has_collection,
         mock_init,
+        milvus_enabled,
     ):
         """When Milvus is enabled, connections and initialization are invoked."""
         manager = Mock()
@@ -228,7 +277,7 @@ class TestSharedMemoryConfig:
 
         with patch('agents.shared_memory.OpenAIClientWrapper') as mock_wrapper, patch.dict(
             os.environ,
-            {"CHAT_API_KEY": "test-key", "TEST_DISABLE_MILVUS": "0"},
+            {"CHAT_API_KEY": "test-key"},
             clear=False,
         ):
             mock_wrapper.return_value = Mock()
@@ -244,25 +293,33 @@ class TestSharedMemoryConfig:
 class TestSharedMemoryErrorHandling:
     """Test SharedMemory error handling."""
     
-    @patch('agents.shared_memory.get_openai_client')
-    @patch('agents.shared_memory.connections.connect')
-    def test_connection_error_handling(self, mock_connect, mock_get_openai_client):
+    @pytest.fixture(scope="class", autouse=True)
+    @classmethod
+    def _openai_client(cls, _stub_milvus):
+        with patch.object(_stub_milvus, 'get_openai_client') as mock_client:
+            yield mock_client
+    
+    @pytest.fixture
+    def milvus(self, milvus_enabled, mock_pymilvus):
+        """Yield the reusable pymilvus stub, clearing any side effects a test installed."""
+        yield mock_pymilvus
+        for mock in (mock_pymilvus.connections.connect, mock_pymilvus.utility.has_collection):
+            mock.reset_mock(return_value=True, side_effect=True)
+    
+    def test_connection_error_handling(self, milvus):
         """Test handling of connection errors."""
-        mock_connect.side_effect = Exception("Connection failed")
+        milvus.connections.connect.side_effect = Exception("Connection failed")
         
-        with patch.dict(os.environ, {"CHAT_API_KEY": "test-key", "TEST_DISABLE_MILVUS": "0"}, clear=False):
+        with patch.dict(os.environ, {"CHAT_API_KEY": "test-key"}, clear=False):
             with pytest.raises(Exception):
                 SharedMemory()
     
-    @patch('agents.shared_memory.get_openai_client')
-    @patch('agents.shared_memory.connections.connect')
-    @patch('agents.shared_memory.utility.has_collection')
-    def test_collection_error_handling(self, mock_has_collection, mock_connect, mock_get_openai_client):
+    def test_collection_error_handling(self, milvus):
         """Test handling of collection errors."""
-        mock_has_collection.side_effect = MockMilvusException("Collection error")
+        milvus.utility.has_collection.side_effect = milvus.MilvusException("Collection error")
         
-        with patch.dict(os.environ, {"CHAT_API_KEY": "test-key", "TEST_DISABLE_MILVUS": "0"}, clear=False):
-            with pytest.raises(SharedMilvusException):
+        with patch.dict(os.environ, {"CHAT_API_KEY": "test-key"}, clear=False):
+            with pytest.raises(milvus.MilvusException):
                 SharedMemory()
 
 
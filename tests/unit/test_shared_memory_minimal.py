@@ -6,35 +6,13 @@ using mocked Milvus connections to avoid external dependencies.
 """
 
 import pytest
-import sys
 from unittest.mock import Mock, MagicMock, patch
 
-# Mock external dependencies before importing
-class MockMilvusException(Exception):
-    pass
-
-mock_pymilvus = Mock()
-mock_pymilvus.connections = Mock()
-mock_pymilvus.Collection = Mock
-mock_pymilvus.CollectionSchema = Mock
-mock_pymilvus.DataType = Mock()
-mock_pymilvus.DataType.INT64 = 'INT64'
-mock_pymilvus.DataType.VARCHAR = 'VARCHAR'
-mock_pymilvus.DataType.FLOAT_VECTOR = 'FLOAT_VECTOR'
-mock_pymilvus.FieldSchema = Mock
-mock_pymilvus.MilvusException = MockMilvusException
-mock_pymilvus.utility = Mock()
-sys.modules['pymilvus'] = mock_pymilvus
-
-class MockNumpy:
-    def array(self, data):
-        return data
-    def __getattr__(self, name):
-        return Mock()
-sys.modules['numpy'] = MockNumpy()
-
 from agents.shared_memory import SharedMemory, MemoryMetrics, EmbeddingCache
 
+# pymilvus is imported lazily, so the shared stub only needs to be active while tests run.
+pytestmark = pytest.mark.usefixtures("mock_pymilvus")
+
 
 @pytest.mark.smoke
 class TestMemoryMetrics:
@@ -128,7 +106,6 @@ class TestEmbeddingCache:
         cache = EmbeddingCache(max_size=100)
         assert cache.max_size == 100
         assert len(cache._cache) == 0
-        assert len(cache._access_order) == 0
     
     def test_cache_key_generation(self):
         """Test cache key is generated consistently."""
@@ -201,7 +178,6 @@ class TestEmbeddingCache:
         cache.clear()
         
         assert len(cache._cache) == 0
-        assert len(cache._access_order) == 0
         assert cache.size() == 0
         assert cache.get("text1", "model") is None
     
@@ -8,6 +8,18 @@ covered by existing integration tests.
 import pytest
 from unittest.mock import patch, Mock
 
+from agents.base import AgentResponse
+from utils.config_validator import ConfigValidationError
+from utils.openai_client import (
+    ChatAPIConfig,
+    ChatMessage,
+    EmbeddingAPIConfig,
+    OpenAIConfig,
+    OpenAIError,
+    ProviderType,
+    _lookup_provider,
+)
+
 
 @pytest.mark.smoke
 class TestProviderType:
@@ -15,30 +27,33 @@ class TestProviderType:
     
     def test_provider_type_values(self):
         """Test all provider type enum values."""
-        from utils.openai_client import ProviderType
-        
         assert ProviderType.OPENAI.value == 'openai'
         assert ProviderType.OLLAMA.value == 'ollama'
         assert ProviderType.CUSTOM.value == 'custom'
     
     def test_provider_type_string_representation(self):
         """Test provider type string representations."""
-        from utils.openai_client import ProviderType
-        
         assert str(ProviderType.OPENAI.value) == 'openai'
         assert str(ProviderType.OLLAMA.value) == 'ollama'
         assert str(ProviderType.CUSTOM.value) == 'custom'
     
     def test_provider_type_comparison(self):
         """Test provider type can be compared."""
-        from utils.openai_client import ProviderType
-        
         provider1 = ProviderType.OPENAI
         provider2 = ProviderType.OPENAI
         provider3 = ProviderType.OLLAMA
         
         assert provider1 == provider2
         assert provider1 != provider3
+    
+    def test_provider_lookup_matches_enum_constructor(self):
+        """Test the precomputed provider lookup agrees with ProviderType(value)."""
+        for provider in ProviderType:
+            assert _lookup_provider(provider.value) is ProviderType(provider.value)
+        
+        assert _lookup_provider('OLLAMA') is None
+        assert _lookup_provider('OLLAMA', casefold=True) is ProviderType.OLLAMA
+        assert _lookup_provider('unknown') is None
 
 
 @pytest.mark.smoke
@@ -53,8 +68,6 @@ class TestChatAPIConfig:
     @patch('utils.openai_client.load_dotenv')
     def test_chat_api_config_from_env_basic(self, mock_load_dotenv):
         """Test ChatAPIConfig can load from environment."""
-        from utils.openai_client import ChatAPIConfig
-        
         config = ChatAPIConfig.from_env(load_env=False)
         
         assert config.api_key == 'test-key-123'
@@ -62,8 +75,6 @@ class TestChatAPIConfig:
     
     def test_chat_api_config_initialization(self):
         """Test ChatAPIConfig can be initialized directly."""
-        from utils.openai_client import ChatAPIConfig, ProviderType
-        
         config = ChatAPIConfig(
             api_key='test-key',
             base_url='https://api.example.com',
@@ -85,8 +96,6 @@ class TestEmbeddingAPIConfig:
     
     def test_embedding_api_config_initialization(self):
         """Test EmbeddingAPIConfig can be initialized directly."""
-        from utils.openai_client import EmbeddingAPIConfig, ProviderType
-        
         config = EmbeddingAPIConfig(
             api_key='test-key',
             base_url='https://api.example.com',
@@ -110,8 +119,6 @@ class TestEmbeddingAPIConfig:
     @patch('utils.openai_client.load_dotenv')
     def test_embedding_api_config_from_env_basic(self, mock_load_dotenv):
         """Test EmbeddingAPIConfig can load from environment."""
-        from utils.openai_client import EmbeddingAPIConfig
-        
         config = EmbeddingAPIConfig.from_env(load_env=False)
         
         assert config.api_key == 'embed-key-123'
@@ -124,8 +131,6 @@ class TestOpenAIConfig:
     
     def test_openai_config_initialization(self):
         """Test OpenAIConfig can be initialized with chat and embedding configs."""
-        from utils.openai_client import OpenAIConfig, ChatAPIConfig, EmbeddingAPIConfig, ProviderType
-        
         chat_config = ChatAPIConfig(
             api_key='chat-key',
             model='gpt-4',
@@ -148,8 +153,6 @@ class TestOpenAIConfig:
     
     def test_openai_config_legacy_properties(self):
         """Test OpenAIConfig provides legacy property access."""
-        from utils.openai_client import OpenAIConfig, ChatAPIConfig, EmbeddingAPIConfig, ProviderType
-        
         chat_config = ChatAPIConfig(
             api_key='chat-key',
             base_url='https://api.openai.com/v1',
@@ -183,8 +186,6 @@ class TestConfigValidationError:
     
     def test_config_validation_error_can_be_raised(self):
         """Test ConfigValidationError can be raised and caught."""
-        from utils.config_validator import ConfigValidationError
-        
         with pytest.raises(ConfigValidationError) as exc_info:
             raise ConfigValidationError("Test error message")
         
@@ -192,8 +193,6 @@ class TestConfigValidationError:
     
     def test_config_validation_error_is_exception(self):
         """Test ConfigValidationError is an Exception subclass."""
-        from utils.config_validator import ConfigValidationError
-        
         assert issubclass(ConfigValidationError, Exception)
 
 
@@ -203,8 +202,6 @@ class TestOpenAIError:
     
     def test_openai_error_can_be_raised(self):
         """Test OpenAIError can be raised and caught."""
-        from utils.openai_client import OpenAIError
-        
         with pytest.raises(OpenAIError) as exc_info:
             raise OpenAIError("Test OpenAI error")
         
@@ -212,8 +209,6 @@ class TestOpenAIError:
     
     def test_openai_error_is_exception(self):
         """Test OpenAIError is an Exception subclass."""
-        from utils.openai_client import OpenAIError
-        
         assert issubclass(OpenAIError, Exception)
 
 
@@ -223,8 +218,6 @@ class TestChatMessage:
     
     def test_chat_message_structure(self):
         """Test ChatMessage can be created with correct structure."""
-        from utils.openai_client import ChatMessage
-        
         # ChatMessage is a TypedDict, so we just create a dict
         message: ChatMessage = {
             "role": "user",
@@ -236,8 +229,6 @@ class TestChatMessage:
     
     def test_chat_message_system_role(self):
         """Test ChatMessage with system role."""
-        from utils.openai_client import ChatMessage
-        
         message: ChatMessage = {
             "role": "system",
             "content": "You are a helpful assistant."
@@ -253,8 +244,6 @@ class TestAgentResponse:
     
     def test_agent_response_with_metadata(self):
         """Test AgentResponse with complex metadata."""
-        from agents.base import AgentResponse
-        
         metadata = {
             "sources": ["doc1", "doc2"],
             "confidence": 0.95,
@@ -273,8 +262,6 @@ class TestAgentResponse:
     
     def test_agent_response_equality(self):
         """Test AgentResponse equality comparison."""
-        from agents.base import AgentResponse
-        
         resp1 = AgentResponse(content="test", metadata={"key": "value"})
         resp2 = AgentResponse(content="test", metadata={"key": "value"})
         resp3 = AgentResponse(content="different", metadata={"key": "value"})
@@ -8,6 +8,7 @@ from .observability import (
     configure_logging,
     correlation_context,
     get_correlation_id,
+    handle_metrics_request,
     is_metrics_server_running,
     metrics_registry,
     new_correlation_id,
@@ -50,6 +51,7 @@ __all__ = [
     'clear_correlation_id',
     'new_correlation_id',
     'metrics_registry',
+    'handle_metrics_request',
     'start_metrics_server',
     'stop_metrics_server',
     'is_metrics_server_running',
@@ -10,6 +10,8 @@ This module provides configuration loading and management with support for:
 from __future__ import annotations
 
 import os
+import threading
+from dataclasses import replace
 from typing import Any, Dict, Optional
 
 import yaml
@@ -17,7 +19,7 @@ from loguru import logger
 from dotenv import load_dotenv
 
 from .config_validator import ConfigValidator, ConfigValidationError
-from .openai_client import ChatAPIConfig, EmbeddingAPIConfig, OpenAIConfig, ProviderType, BrowserToolConfig
+from .openai_client import ChatAPIConfig, EmbeddingAPIConfig, OpenAIConfig, ProviderType, BrowserToolConfig, _lookup_provider
 
 
 # Load environment variables from .env file
@@ -40,6 +42,19 @@ class ConfigManager:
         self._agent_configs: Dict[str, OpenAIConfig] = {}
         self._browser_tool_configs: Dict[str, BrowserToolConfig] = {}
     
+    def load(self) -> Dict[str, Any]:
+        """Load (or return the already parsed) YAML configuration.
+        
+        Construction never touches the filesystem; the file is read on the
+        first call to this method or to any accessor that needs it.
+        
+        Returns
+        -------
+        Dict[str, Any]
+            Parsed configuration mapping.
+        """
+        return self._load_yaml_config()
+    
     def _load_yaml_config(self) -> Dict[str, Any]:
         """Load YAML configuration from file."""
         if self._yaml_config is None:
@@ -153,8 +168,9 @@ class ConfigManager:
     @staticmethod
     def _env_override_active(*names: str) -> bool:
         """Return True if any provided environment variable is set to a non-empty value."""
+        get = os.environ.get
         for name in names:
-            value = os.getenv(name)
+            value = get(name)
             if value is not None and value.strip() != "":
                 return True
         return False
@@ -167,22 +183,25 @@ class ConfigManager:
         chat_settings = api_config.get('chat_api') or {}
         embedding_settings = api_config.get('embedding_api') or {}
         applied_fields: Dict[str, Any] = {}
+        chat_updates: Dict[str, Any] = {}
+        embedding_updates: Dict[str, Any] = {}
         
         if chat_settings:
             if not self._env_override_active("CHAT_API_MODEL", "OPENAI_MODEL"):
                 chat_model_value = chat_settings.get('model')
                 if chat_model_value:
-                    config.chat_api.model = str(chat_model_value)
-                    applied_fields['chat_model'] = config.chat_api.model
+                    chat_updates['model'] = str(chat_model_value)
+                    applied_fields['chat_model'] = chat_updates['model']
             if not self._env_override_active("CHAT_API_PROVIDER"):
                 provider_value = chat_settings.get('provider')
                 if provider_value:
-                    provider_candidate = str(provider_value).strip().lower()
+                    provider_candidate = str(provider_value).strip()
                     if provider_candidate:
-                        try:
-                            config.chat_api.provider = ProviderType(provider_candidate)
-                            applied_fields['chat_provider'] = config.chat_api.provider.value
-                        except ValueError:
+                        provider = _lookup_provider(provider_candidate, casefold=True)
+                        if provider is not None:
+                            chat_updates['provider'] = provider
+                            applied_fields['chat_provider'] = provider.value
+                        else:
                             logger.warning(
                                 "Ignoring unsupported chat provider in YAML configuration",
                                 extra={"provider_raw": provider_value},
@@ -197,8 +216,8 @@ class ConfigManager:
                     yaml_value = chat_settings.get(attr)
                     if yaml_value is not None:
                         try:
-                            setattr(config.chat_api, attr, caster(yaml_value))
-                            applied_fields[log_key] = getattr(config.chat_api, attr)
+                            chat_updates[attr] = caster(yaml_value)
+                            applied_fields[log_key] = chat_updates[attr]
                         except (TypeError, ValueError):
                             logger.warning(
                                 "Invalid YAML value for chat API setting",
@@ -209,17 +228,18 @@ class ConfigManager:
             if not self._env_override_active("EMBEDDING_API_MODEL", "EMBEDDING_MODEL"):
                 embedding_model_value = embedding_settings.get('model')
                 if embedding_model_value:
-                    config.embedding_api.model = str(embedding_model_value)
-                    applied_fields['embedding_model'] = config.embedding_api.model
+                    embedding_updates['model'] = str(embedding_model_value)
+                    applied_fields['embedding_model'] = embedding_updates['model']
             if not self._env_override_active("EMBEDDING_API_PROVIDER"):
                 embedding_provider_value = embedding_settings.get('provider')
                 if embedding_provider_value:
-                    provider_candidate = str(embedding_provider_value).strip().lower()
+                    provider_candidate = str(embedding_provider_value).strip()
                     if provider_candidate:
-                        try:
-                            config.embedding_api.provider = ProviderType(provider_candidate)
-                            applied_fields['embedding_provider'] = config.embedding_api.provider.value
-                        except ValueError:
+                        provider = _lookup_provider(provider_candidate, casefold=True)
+                        if provider is not None:
+                            embedding_updates['provider'] = provider
+                            applied_fields['embedding_provider'] = provider.value
+                        else:
                             logger.warning(
                                 "Ignoring unsupported embedding provider in YAML configuration",
                                 extra={"provider_raw": embedding_provider_value},
@@ -228,8 +248,8 @@ class ConfigManager:
                 dimension_value = embedding_settings.get('dimension')
                 if dimension_value is not None:
                     try:
-                        config.embedding_api.dimension = int(dimension_value)
-                        applied_fields['embedding_dimension'] = config.embedding_api.dimension
+                        embedding_updates['dimension'] = int(dimension_value)
+                        applied_fields['embedding_dimension'] = embedding_updates['dimension']
                     except (TypeError, ValueError):
                         logger.warning(
                             "Invalid YAML value for embedding dimension",
@@ -245,8 +265,8 @@ class ConfigManager:
                     yaml_value = embedding_settings.get(attr)
                     if yaml_value is not None:
                         try:
-                            setattr(config.embedding_api, attr, caster(yaml_value))
-                            applied_fields[log_key] = getattr(config.embedding_api, attr)
+                            embedding_updates[attr] = caster(yaml_value)
+                            applied_fields[log_key] = embedding_updates[attr]
                         except (TypeError, ValueError):
                             logger.warning(
                                 "Invalid YAML value for embedding API setting",
@@ -254,6 +274,12 @@ class ConfigManager:
                             )
         
         if applied_fields:
+            # Config objects are frozen, so YAML defaults produce new instances
+            config = replace(
+                config,
+                chat_api=replace(config.chat_api, **chat_updates),
+                embedding_api=replace(config.embedding_api, **embedding_updates),
+            )
             logger.debug(
                 "Applied YAML defaults to global OpenAI configuration",
                 extra={"applied_fields": applied_fields},
@@ -636,30 +662,68 @@ class ConfigManager:
         
         return definitions
     
-    def reload_config(self):
-        """Reload configuration from file and clear cache."""
-        self._yaml_config = None
+    def invalidate(self, *, keep_yaml: bool = False) -> None:
+        """Drop cached per-agent configurations and, by default, the parsed YAML.
+        
+        Parameters
+        ----------
+        keep_yaml:
+            Keep the parsed YAML and only clear configurations derived from the
+            environment. Useful when the file is known not to have changed.
+        """
+        if not keep_yaml:
+            self._yaml_config = None
         self._agent_configs.clear()
         self._browser_tool_configs.clear()
+    
+    def reload_config(self):
+        """Reload configuration from file and clear cache."""
+        self.invalidate()
         logger.info("Configuration reloaded")
 
 
 # Global configuration manager instance
 _global_config_manager: Optional[ConfigManager] = None
+# Shared managers for explicitly requested configuration paths, oldest first
+_path_config_managers: Dict[str, ConfigManager] = {}
+# Paths beyond this many evict the oldest manager so one-off paths cannot pile up
+_PATH_CONFIG_MANAGER_LIMIT = 32
+_config_manager_lock = threading.Lock()
 
 
-def get_config_manager() -> ConfigManager:
-    """Get the global configuration manager instance.
+def get_config_manager(config_path: Optional[str] = None) -> ConfigManager:
+    """Get the shared configuration manager instance.
+    
+    Parameters
+    ----------
+    config_path:
+        Optional YAML configuration path. When omitted the process-wide
+        default manager is returned; otherwise one manager is shared per path,
+        keeping at most ``_PATH_CONFIG_MANAGER_LIMIT`` paths (oldest evicted first).
     
     Returns
     -------
     ConfigManager
-        Global configuration manager.
+        Shared configuration manager.
     """
     global _global_config_manager
-    if _global_config_manager is None:
-        _global_config_manager = ConfigManager()
-    return _global_config_manager
+    if config_path is None:
+        if _global_config_manager is None:
+            with _config_manager_lock:
+                if _global_config_manager is None:
+                    _global_config_manager = ConfigManager()
+        return _global_config_manager
+    
+    manager = _path_config_managers.get(config_path)
+    if manager is None:
+        with _config_manager_lock:
+            manager = _path_config_managers.get(config_path)
+            if manager is None:
+                manager = ConfigManager(config_path)
+                if len(_path_config_managers) >= _PATH_CONFIG_MANAGER_LIMIT:
+                    del _path_config_managers[next(iter(_path_config_managers))]
+                _path_config_managers[config_path] = manager
+    return manager
 
 
 def get_agent_config(agent_name: str) -> OpenAIConfig:
@@ -9,13 +9,19 @@ import sys
 import threading
 import time
 import uuid
+import warnings
 from contextlib import contextmanager
 from contextvars import ContextVar
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from loguru import logger
 
+try:
+    import orjson
+except ImportError:  # optional: fall back to the stdlib encoder
+    orjson = None
+
 
 RUN_ID: str = os.getenv("RUN_ID", uuid.uuid4().hex)
 
@@ -56,18 +62,11 @@ def _infer_agent(record: Dict[str, Any]) -> str:
     return "system"
 
 
-def _get_correlation_from_context() -> Optional[str]:
-    try:
-        return _CORRELATION_ID.get()
-    except LookupError:  # pragma: no cover - defensive, ContextVar always set
-        return None
-
-
 def _patch_record(record: Dict[str, Any]) -> None:
     extra = record["extra"]
     extra.setdefault("run_id", RUN_ID)
 
-    correlation = extra.get("correlation_id") or _get_correlation_from_context()
+    correlation = extra.get("correlation_id") or _CORRELATION_ID.get()
     extra["correlation_id"] = correlation or "-"
 
     agent = extra.get("agent") or extra.get("agent_id")
@@ -147,7 +146,7 @@ def configure_logging(*, log_format: Optional[str] = None, log_level: Optional[s
 
 def get_correlation_id() -> Optional[str]:
     """Return the current correlation ID, if any."""
-    return _get_correlation_from_context()
+    return _CORRELATION_ID.get()
 
 
 def set_correlation_id(correlation_id: Optional[str]) -> None:
@@ -178,18 +177,141 @@ def correlation_context(correlation_id: Optional[str]) -> Any:
         _CORRELATION_ID.reset(token)
 
 
-class MetricsRegistry:
-    """Lightweight metrics aggregator for in-process observability."""
+def _add_count(counts: Dict[str, int], key: str, amount: int) -> None:
+    """Add ``amount`` to ``counts[key]``, interning ``key`` the first time it is seen."""
+    if key in counts:
+        counts[key] += amount
+    else:
+        counts[sys.intern(key)] = amount
+
+
+def _copy_dicts(value: Any) -> Any:
+    """Copy nested dicts so callers can mutate a snapshot without touching the memo."""
+    if isinstance(value, dict):
+        return {key: _copy_dicts(val) for key, val in value.items()}
+    return value
+
+
+class _TDigest:
+    """Merging t-digest (Dunning) for streaming quantiles in bounded memory.
+
+    Samples are buffered and periodically merged into centroids whose size is
+    bounded by the ``k1`` scale function, so tails stay accurate while the
+    middle of the distribution is summarised coarsely. With ``compression``
+    ``δ`` the digest keeps roughly ``δ`` centroids regardless of sample count.
+    """
+
+    __slots__ = ("_compression", "_centroids", "_buffer", "_count")
+
+    def __init__(self, compression: float = 100.0):
+        self._compression = max(float(compression), 1.0)
+        self._centroids: List[Tuple[float, float]] = []
+        self._buffer: List[Tuple[float, float]] = []
+        self._count = 0.0
+
+    def update(self, value: float, weight: float = 1.0) -> None:
+        self._buffer.append((value, weight))
+        self._count += weight
+        if len(self._buffer) >= self._compression:
+            self._compress()
+
+    def _k_to_q(self, k: float) -> float:
+        scaled = 2.0 * math.pi * k / self._compression
+        return (math.sin(max(-math.pi / 2, min(math.pi / 2, scaled))) + 1.0) / 2.0
+
+    def _q_to_k(self, q: float) -> float:
+        return self._compression / (2.0 * math.pi) * math.asin(2.0 * q - 1.0)
+
+    def _compress(self) -> None:
+        if not self._buffer:
+            return
+        points = sorted(self._centroids + self._buffer)
+        self._buffer = []
+
+        merged: List[Tuple[float, float]] = []
+        mean, weight = points[0]
+        cumulative = 0.0
+        q_limit = self._k_to_q(self._q_to_k(0.0) + 1.0)
+        for point_mean, point_weight in points[1:]:
+            if (cumulative + weight + point_weight) / self._count <= q_limit:
+                weight += point_weight
+                mean += (point_mean - mean) * point_weight / weight
+            else:
+                merged.append((mean, weight))
+                cumulative += weight
+                q_limit = self._k_to_q(self._q_to_k(cumulative / self._count) + 1.0)
+                mean, weight = point_mean, point_weight
+        merged.append((mean, weight))
+        self._centroids = merged
+
+    def quantile(self, q: float) -> Optional[float]:
+        self._compress()
+        centroids = self._centroids
+        if not centroids:
+            return None
+        if len(centroids) == 1:
+            return centroids[0][0]
+
+        # Interpolate between centroid centres. The 0.5 offset makes unit-weight
+        # centroids reproduce the exact linear-interpolation percentile.
+        target = q * (self._count - 1.0) + 0.5
+        cumulative = 0.0
+        previous_mean, previous_center = None, 0.0
+        for mean, weight in centroids:
+            center = cumulative + weight / 2.0
+            if target <= center:
+                if previous_mean is None:
+                    return mean
+                fraction = (target - previous_center) / (center - previous_center)
+                return previous_mean + (mean - previous_mean) * fraction
+            previous_mean, previous_center = mean, center
+            cumulative += weight
+        return centroids[-1][0]
+
 
-    def __init__(self, *, max_samples: int = 500):
-        self._lock = threading.RLock()
-        self._max_samples = max_samples
+class MetricsRegistry:
+    """Lightweight metrics aggregator for in-process observability.
+
+    Per-agent latency percentiles come from a :class:`_TDigest` with the given
+    ``compression`` and cover every recorded sample; memory stays bounded and
+    ``snapshot`` never sorts the raw samples. ``max_samples`` is deprecated and
+    ignored: it used to cap a window of raw samples, which the digest replaces.
+    Every ``record_*``/``clear`` call bumps ``_version``; the aggregated
+    metrics and their encoded JSON are rebuilt only when the version has
+    moved. ``snapshot`` still returns a fresh dict with the current
+    ``timestamp`` on every call, read from ``clock``.
+    """
+
+    def __init__(
+        self,
+        *,
+        compression: float = 100.0,
+        max_samples: Optional[int] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        if max_samples is not None:
+            warnings.warn(
+                "MetricsRegistry(max_samples=...) is deprecated and ignored; "
+                "percentiles now cover every sample. Use 'compression' to tune accuracy.",
+                DeprecationWarning,
+                stacklevel=2,
+            )
+        # A plain (non-reentrant) lock: no method re-acquires it, and recording is
+        # overwhelmingly uncontended, so this keeps the hot path to one cheap acquire.
+        self._lock = threading.Lock()
+        self._compression = compression
+        self._clock = clock
         self._agents: Dict[str, Dict[str, Any]] = {}
         self._retrieval_hits: Dict[str, int] = {}
         self._synthesis_tokens: Dict[str, int] = {}
+        self._version = 0
+        self._cached_version = -1
+        self._cached_snapshot: Dict[str, Any] = {}
+        self._cached_payload: Optional[bytes] = None
 
     def clear(self) -> None:
         with self._lock:
+            self._version += 1
             self._agents.clear()
             self._retrieval_hits.clear()
             self._synthesis_tokens.clear()
@@ -201,15 +323,18 @@ class MetricsRegistry:
         error = normalized_status in {"error", "failed", "failure"}
 
         with self._lock:
-            stats = self._agents.setdefault(
-                agent_key,
-                {
+            self._version += 1
+            stats = self._agents.get(agent_key)
+            if stats is None:
+                # Built only on first sight of an agent (``setdefault`` would allocate a
+                # digest per call); the key is interned so later lookups with the
+                # usual literal names hit on identity.
+                stats = self._agents[sys.intern(agent_key)] = {
                     "request_count": 0,
                     "success_count": 0,
                     "error_count": 0,
-                    "latencies": [],
-                },
-            )
+                    "latency_digest": _TDigest(self._compression),
+                }
             stats["request_count"] += 1
             if success:
                 stats["success_count"] += 1
@@ -217,84 +342,117 @@ class MetricsRegistry:
                 stats["error_count"] += 1
 
             if latency_seconds is not None:
-                stats["latencies"].append(max(latency_seconds, 0.0))
-                if len(stats["latencies"]) > self._max_samples:
-                    stats["latencies"] = stats["latencies"][-self._max_samples :]
+                stats["latency_digest"].update(max(latency_seconds, 0.0))
 
     def record_retrieval_hits(self, agent: str, hits: int) -> None:
         with self._lock:
-            self._retrieval_hits[agent or "unknown"] = self._retrieval_hits.get(agent or "unknown", 0) + max(hits, 0)
+            self._version += 1
+            _add_count(self._retrieval_hits, agent or "unknown", max(hits, 0))
 
     def record_synthesis_tokens(self, agent: str, tokens: int) -> None:
         with self._lock:
-            self._synthesis_tokens[agent or "unknown"] = self._synthesis_tokens.get(agent or "unknown", 0) + max(tokens, 0)
-
-    def _compute_percentile(self, values: List[float], percentile: float) -> Optional[float]:
-        if not values:
-            return None
-        sorted_values = sorted(values)
-        k = (len(sorted_values) - 1) * (percentile / 100.0)
-        f = math.floor(k)
-        c = math.ceil(k)
-        if f == c:
-            return sorted_values[int(k)]
-        return sorted_values[f] * (c - k) + sorted_values[c] * (k - f)
+            self._version += 1
+            _add_count(self._synthesis_tokens, agent or "unknown", max(tokens, 0))
 
     def snapshot(self) -> Dict[str, Any]:
+        """Return the current metrics as a plain dict with a fresh ``timestamp``."""
         with self._lock:
-            agents_snapshot: Dict[str, Any] = {}
-            totals = {"requests": 0, "success": 0, "errors": 0}
-
-            for agent, stats in self._agents.items():
-                latencies = stats.get("latencies", [])
-                p50 = self._compute_percentile(latencies, 50)
-                p95 = self._compute_percentile(latencies, 95)
-                agents_snapshot[agent] = {
-                    "requests": stats.get("request_count", 0),
-                    "success": stats.get("success_count", 0),
-                    "errors": stats.get("error_count", 0),
-                    "latency_p50_ms": round(p50 * 1000, 3) if p50 is not None else None,
-                    "latency_p95_ms": round(p95 * 1000, 3) if p95 is not None else None,
-                }
-                totals["requests"] += stats.get("request_count", 0)
-                totals["success"] += stats.get("success_count", 0)
-                totals["errors"] += stats.get("error_count", 0)
-
-            retrieval_total = sum(self._retrieval_hits.values())
-            synthesis_total = sum(self._synthesis_tokens.values())
-
-            return {
-                "run_id": RUN_ID,
-                "timestamp": time.time(),
-                "totals": totals,
-                "agents": agents_snapshot,
-                "retrieval": {
-                    "total_hits": retrieval_total,
-                    "per_agent": dict(self._retrieval_hits),
-                },
-                "synthesis": {
-                    "tokens_total": synthesis_total,
-                    "per_agent": dict(self._synthesis_tokens),
-                },
+            cached = self._refresh_snapshot()
+        return {"run_id": RUN_ID, "timestamp": self._clock(), **_copy_dicts(cached)}
+
+    def _refresh_snapshot(self) -> Dict[str, Any]:
+        """Rebuild the memoized (time-independent) snapshot if anything was recorded since.
+
+        The lock must be held. The returned dict is replaced, never mutated, on rebuild.
+        """
+        if self._cached_version != self._version:
+            self._cached_snapshot = self._build_snapshot()
+            self._cached_payload = None
+            self._cached_version = self._version
+        return self._cached_snapshot
+
+    def _build_snapshot(self) -> Dict[str, Any]:
+        """Assemble the snapshot fields that only change on record; lock must be held."""
+        agents_snapshot: Dict[str, Any] = {}
+        totals = {"requests": 0, "success": 0, "errors": 0}
+
+        for agent, stats in self._agents.items():
+            digest = stats["latency_digest"]
+            p50 = digest.quantile(0.50)
+            p95 = digest.quantile(0.95)
+            agents_snapshot[agent] = {
+                "requests": stats.get("request_count", 0),
+                "success": stats.get("success_count", 0),
+                "errors": stats.get("error_count", 0),
+                "latency_p50_ms": round(p50 * 1000, 3) if p50 is not None else None,
+                "latency_p95_ms": round(p95 * 1000, 3) if p95 is not None else None,
             }
+            totals["requests"] += stats.get("request_count", 0)
+            totals["success"] += stats.get("success_count", 0)
+            totals["errors"] += stats.get("error_count", 0)
+
+        retrieval_total = sum(self._retrieval_hits.values())
+        synthesis_total = sum(self._synthesis_tokens.values())
+
+        return {
+            "run_id": RUN_ID,
+            "totals": totals,
+            "agents": agents_snapshot,
+            "retrieval": {
+                "total_hits": retrieval_total,
+                "per_agent": dict(self._retrieval_hits),
+            },
+            "synthesis": {
+                "tokens_total": synthesis_total,
+                "per_agent": dict(self._synthesis_tokens),
+            },
+        }
 
+    def snapshot_json(self) -> bytes:
+        """Return :meth:`snapshot` as UTF-8 JSON.
+
+        The encoded metrics are cached until the next update; only the
+        ``timestamp`` is encoded per call and spliced in front of them.
+        """
+        with self._lock:
+            snapshot = self._refresh_snapshot()
+            if self._cached_payload is None:
+                if orjson is not None:
+                    self._cached_payload = orjson.dumps(snapshot, default=_json_default)
+                else:
+                    self._cached_payload = json.dumps(
+                        snapshot, default=_json_default, ensure_ascii=False
+                    ).encode("utf-8")
+            payload = self._cached_payload
+        return b'{"timestamp": ' + repr(self._clock()).encode("ascii") + b", " + payload[1:]
 
 metrics_registry = MetricsRegistry()
 
 
+def handle_metrics_request(path: str = "/metrics") -> Tuple[int, bytes]:
+    """Resolve a metrics endpoint GET in-process, returning ``(status, body)``.
+
+    The HTTP server is a thin wrapper around this, so callers (and tests) can
+    read the payload without going through a socket.
+    """
+    if path.rstrip("/") == "/metrics":
+        return 200, metrics_registry.snapshot_json()
+    return 404, b""
+
+
 class _MetricsRequestHandler(BaseHTTPRequestHandler):  # pragma: no cover - exercised via tests
     server_version = "ObservabilityMetrics/1.0"
 
     def do_GET(self) -> None:  # noqa: N802 - BaseHTTPRequestHandler contract
-        if self.path.rstrip("/") == "/metrics":
-            payload = json.dumps(metrics_registry.snapshot(), default=_json_default, ensure_ascii=False).encode("utf-8")
-            self.send_response(200)
-            self.send_header("Content-Type", "application/json")
-            self.send_header("Content-Length", str(len(payload)))
-            self.end_headers()
-            self.wfile.write(payload)
-        else:
-            self.send_error(404, "Not Found")
+        status, payload = handle_metrics_request(self.path)
+        if status != 200:
+            self.send_error(status, "Not Found")
+            return
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
 
     def log_message(self, format: str, *args: Any) -> None:  # noqa: D401, N802
         """Route server access logs through loguru."""
@@ -360,6 +518,7 @@ __all__ = [
     "new_correlation_id",
     "correlation_context",
     "metrics_registry",
+    "handle_metrics_request",
     "start_metrics_server",
     "stop_metrics_server",
     "is_metrics_server_running",
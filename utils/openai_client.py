@@ -15,14 +15,14 @@ Features:
 from __future__ import annotations
 
 import os
+import sys
 import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Union
 
 import openai
-from dotenv import load_dotenv
 from loguru import logger
 from openai import OpenAI
 from openai.types.chat import ChatCompletion
@@ -30,6 +30,13 @@ from openai.types.embedding import Embedding
 from pydantic import BaseModel, Field
 
 
+def load_dotenv(*args: Any, **kwargs: Any) -> bool:
+    """Load ``.env`` values, importing python-dotenv only on first use."""
+    from dotenv import load_dotenv as _load_dotenv
+
+    return _load_dotenv(*args, **kwargs)
+
+
 class ProviderType(str, Enum):
     """Supported provider types for APIs."""
     OPENAI = "openai"
@@ -37,6 +44,19 @@ class ProviderType(str, Enum):
     CUSTOM = "custom"
 
 
+# Value -> member lookup that avoids the enum constructor's raise-and-catch on misses.
+_PROVIDER_MAP: Dict[str, ProviderType] = {provider.value: provider for provider in ProviderType}
+
+
+def _lookup_provider(value: str, *, casefold: bool = False) -> Optional[ProviderType]:
+    """Return the provider member named by ``value``, or ``None`` when unknown.
+
+    Environment values are matched case-sensitively; ``casefold=True`` enables
+    the case-insensitive matching used for YAML settings.
+    """
+    return _PROVIDER_MAP.get(value.casefold() if casefold else value)
+
+
 def _get_env_value(primary: str, fallback_names: Tuple[str, ...] = (), default: Optional[str] = None) -> Optional[str]:
     """Retrieve environment variable preserving empty strings.
 
@@ -49,25 +69,158 @@ def _get_env_value(primary: str, fallback_names: Tuple[str, ...] = (), default:
     default:
         Default value to return when neither primary nor fallbacks are defined.
     """
-    value = os.getenv(primary)
+    get = os.environ.get
+    value = get(primary)
     if value is not None:
         return value
 
     for name in fallback_names:
-        fallback_value = os.getenv(name)
+        fallback_value = get(name)
         if fallback_value is not None:
             return fallback_value
 
     return default
 
 
-@dataclass
+def _coerce_str(raw: str, default: Any) -> str:
+    """Strip surrounding whitespace while preserving explicit empty strings."""
+    # Most values are already trimmed; only pay for strip() when an edge is whitespace.
+    if raw and (raw[0].isspace() or raw[-1].isspace()):
+        return raw.strip()
+    return raw
+
+
+def _coerce_int(raw: str, default: Any) -> int:
+    """Parse an integer, treating an empty value as unset."""
+    return int(raw) if raw else default
+
+
+def _coerce_float(raw: str, default: Any) -> float:
+    """Parse a float, treating an empty value as unset."""
+    return float(raw) if raw else default
+
+
+def _coerce_provider(raw: str, default: ProviderType) -> ProviderType:
+    """Resolve a provider name, warning and defaulting on unknown values."""
+    provider_value = raw.strip()
+    if not provider_value:
+        return default
+    provider = _lookup_provider(provider_value)
+    if provider is None:
+        logger.warning(
+            f"Unknown provider '{provider_value}', defaulting to 'openai'"
+        )
+        return ProviderType.OPENAI
+    return provider
+
+
+# Default model names contain '-' and '.', so CPython does not intern them automatically.
+_DEFAULT_CHAT_MODEL = sys.intern("gpt-3.5-turbo")
+_DEFAULT_EMBEDDING_MODEL = sys.intern("text-embedding-3-small")
+
+# Declarative environment schema: (field, env names in precedence order, default, coercer).
+_EnvFieldSpec = Tuple[str, Tuple[str, ...], Any, Callable[[str, Any], Any]]
+
+_CHAT_API_ENV_SPEC: Tuple[_EnvFieldSpec, ...] = (
+    ("api_key", ("CHAT_API_KEY", "OPENAI_API_KEY"), None, _coerce_str),
+    ("base_url", ("CHAT_API_BASE_URL", "OPENAI_BASE_URL"), None, _coerce_str),
+    ("model", ("CHAT_API_MODEL", "OPENAI_MODEL"), _DEFAULT_CHAT_MODEL, _coerce_str),
+    ("provider", ("CHAT_API_PROVIDER",), ProviderType.OPENAI, _coerce_provider),
+    ("timeout", ("CHAT_API_TIMEOUT",), 30, _coerce_int),
+    ("max_retries", ("CHAT_API_MAX_RETRIES",), 3, _coerce_int),
+    ("retry_delay", ("CHAT_API_RETRY_DELAY",), 1.0, _coerce_float),
+    ("max_retry_delay", ("CHAT_API_MAX_RETRY_DELAY",), 60.0, _coerce_float),
+)
+
+_EMBEDDING_API_ENV_SPEC: Tuple[_EnvFieldSpec, ...] = (
+    ("api_key", ("EMBEDDING_API_KEY", "OPENAI_API_KEY"), None, _coerce_str),
+    ("base_url", ("EMBEDDING_API_BASE_URL", "OPENAI_BASE_URL"), None, _coerce_str),
+    ("model", ("EMBEDDING_API_MODEL", "EMBEDDING_MODEL"), _DEFAULT_EMBEDDING_MODEL, _coerce_str),
+    ("provider", ("EMBEDDING_API_PROVIDER",), ProviderType.OPENAI, _coerce_provider),
+    ("timeout", ("EMBEDDING_API_TIMEOUT",), 30, _coerce_int),
+    ("max_retries", ("EMBEDDING_API_MAX_RETRIES",), 3, _coerce_int),
+    ("retry_delay", ("EMBEDDING_API_RETRY_DELAY",), 1.0, _coerce_float),
+    ("max_retry_delay", ("EMBEDDING_API_MAX_RETRY_DELAY",), 60.0, _coerce_float),
+)
+
+
+# Known embedding model output sizes, used when EMBEDDING_DIMENSION is unset.
+_MODEL_DIMENSIONS: Dict[str, int] = {
+    _DEFAULT_EMBEDDING_MODEL: 1536,
+    "text-embedding-3-large": 3072,
+    "text-embedding-ada-002": 1536,
+    "nomic-embed-text": 768,
+}
+
+
+# Every environment variable consulted when building chat/embedding configuration.
+_CONFIG_ENV_KEYS: Tuple[str, ...] = tuple(
+    dict.fromkeys(
+        [name for spec in (_CHAT_API_ENV_SPEC, _EMBEDDING_API_ENV_SPEC) for _, names, _, _ in spec for name in names]
+        + ["EMBEDDING_DIMENSION"]
+    )
+)
+
+
+# Memoized OpenAIConfig.from_env_with_fallback results keyed by environment snapshot.
+_ENV_SNAPSHOT_CACHE: Dict[Tuple[Any, ...], Any] = {}
+_ENV_SNAPSHOT_CACHE_SIZE = 32
+
+
+def _clear_env_cache() -> None:
+    """Forget memoized configurations so the next load re-reads the environment."""
+    _ENV_SNAPSHOT_CACHE.clear()
+
+
+def _snapshot_env() -> Dict[str, str]:
+    """Read all configuration-related environment variables in one pass."""
+    get = os.environ.get
+    snapshot: Dict[str, str] = {}
+    for name in _CONFIG_ENV_KEYS:
+        value = get(name)
+        if value is not None:
+            snapshot[name] = value
+    return snapshot
+
+
+def _resolve_env_fields(
+    spec: Tuple[_EnvFieldSpec, ...],
+    env: Optional[Mapping[str, str]] = None,
+) -> Dict[str, Any]:
+    """Resolve every field in ``spec`` from the environment in a single pass.
+
+    The first environment variable present (including empty strings) wins;
+    absent fields fall back to the declared default without coercion. All
+    unparseable values are collected and reported in a single ``ValueError``.
+    """
+    get = (os.environ if env is None else env).get
+    values: Dict[str, Any] = {}
+    errors: List[str] = []
+    for attr, names, default, coerce in spec:
+        raw = None
+        for name in names:
+            raw = get(name)
+            if raw is not None:
+                break
+        if raw is None:
+            values[attr] = default
+            continue
+        try:
+            values[attr] = coerce(raw, default)
+        except ValueError:
+            errors.append(f"{name}={raw!r}")
+    if errors:
+        raise ValueError(f"Invalid configuration value(s): {', '.join(errors)}")
+    return values
+
+
+@dataclass(frozen=True, slots=True)
 class ChatAPIConfig:
     """Configuration for chat completion API."""
     
     api_key: str
     base_url: Optional[str] = None
-    model: str = "gpt-3.5-turbo"
+    model: str = _DEFAULT_CHAT_MODEL
     provider: ProviderType = ProviderType.OPENAI
     timeout: int = 30
     max_retries: int = 3
@@ -75,71 +228,38 @@ class ChatAPIConfig:
     max_retry_delay: float = 60.0
     
     @classmethod
-    def from_env(cls, *, load_env: bool = True) -> "ChatAPIConfig":
-        """Load chat API configuration from environment variables."""
+    def from_env(
+        cls,
+        *,
+        load_env: bool = True,
+        env: Optional[Mapping[str, str]] = None,
+    ) -> "ChatAPIConfig":
+        """Load chat API configuration from environment variables.
+        
+        Parameters
+        ----------
+        load_env:
+            Whether to load the ``.env`` file first.
+        env:
+            Optional pre-read environment mapping; defaults to ``os.environ``.
+        """
         if load_env:
             load_dotenv()
         
-        api_key = _get_env_value("CHAT_API_KEY", ("OPENAI_API_KEY",))
-        if api_key is None:
+        values = _resolve_env_fields(_CHAT_API_ENV_SPEC, env)
+        if not values["api_key"]:
             raise ValueError("CHAT_API_KEY or OPENAI_API_KEY environment variable is required")
-        api_key = api_key.strip()
-        if not api_key:
-            raise ValueError("CHAT_API_KEY or OPENAI_API_KEY environment variable is required")
-        
-        base_url_raw = _get_env_value("CHAT_API_BASE_URL", ("OPENAI_BASE_URL",))
-        base_url: Optional[str] = None
-        if base_url_raw is not None:
-            if isinstance(base_url_raw, str):
-                base_url = base_url_raw.strip()
-            else:
-                base_url = str(base_url_raw)
-        
-        model_raw = _get_env_value("CHAT_API_MODEL", ("OPENAI_MODEL",), "gpt-3.5-turbo")
-        if model_raw is None:
-            model = "gpt-3.5-turbo"
-        elif isinstance(model_raw, str):
-            model = model_raw.strip()
-        else:
-            model = str(model_raw)
-        
-        provider_raw = _get_env_value("CHAT_API_PROVIDER", default="openai")
-        if provider_raw is None:
-            provider_value = "openai"
-        elif isinstance(provider_raw, str):
-            provider_value = provider_raw.strip()
-        else:
-            provider_value = str(provider_raw).strip()
-        if not provider_value:
-            provider_value = "openai"
-        
-        try:
-            provider = ProviderType(provider_value)
-        except ValueError:
-            logger.warning(
-                f"Unknown provider '{provider_value}', defaulting to 'openai'"
-            )
-            provider = ProviderType.OPENAI
         
-        return cls(
-            api_key=api_key,
-            base_url=base_url,
-            model=model,
-            provider=provider,
-            timeout=int(_get_env_value("CHAT_API_TIMEOUT", default="30") or 30),
-            max_retries=int(_get_env_value("CHAT_API_MAX_RETRIES", default="3") or 3),
-            retry_delay=float(_get_env_value("CHAT_API_RETRY_DELAY", default="1.0") or 1.0),
-            max_retry_delay=float(_get_env_value("CHAT_API_MAX_RETRY_DELAY", default="60.0") or 60.0),
-        )
+        return cls(**values)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class EmbeddingAPIConfig:
     """Configuration for embedding API."""
     
     api_key: Optional[str] = None  # Optional for local providers like Ollama
     base_url: Optional[str] = None
-    model: str = "text-embedding-3-small"
+    model: str = _DEFAULT_EMBEDDING_MODEL
     provider: ProviderType = ProviderType.OPENAI
     dimension: int = 1536
     timeout: int = 30
@@ -148,54 +268,29 @@ class EmbeddingAPIConfig:
     max_retry_delay: float = 60.0
     
     @classmethod
-    def from_env(cls, *, load_env: bool = True) -> "EmbeddingAPIConfig":
-        """Load embedding API configuration from environment variables."""
+    def from_env(
+        cls,
+        *,
+        load_env: bool = True,
+        env: Optional[Mapping[str, str]] = None,
+    ) -> "EmbeddingAPIConfig":
+        """Load embedding API configuration from environment variables.
+        
+        Parameters
+        ----------
+        load_env:
+            Whether to load the ``.env`` file first.
+        env:
+            Optional pre-read environment mapping; defaults to ``os.environ``.
+        """
         if load_env:
             load_dotenv()
         
-        api_key_raw = _get_env_value("EMBEDDING_API_KEY", ("OPENAI_API_KEY",))
-        api_key: Optional[str] = None
-        if api_key_raw is not None:
-            if isinstance(api_key_raw, str):
-                api_key = api_key_raw.strip()
-            else:
-                api_key = str(api_key_raw)
-        
-        base_url_raw = _get_env_value("EMBEDDING_API_BASE_URL", ("OPENAI_BASE_URL",))
-        base_url: Optional[str] = None
-        if base_url_raw is not None:
-            if isinstance(base_url_raw, str):
-                base_url = base_url_raw.strip()
-            else:
-                base_url = str(base_url_raw)
-        
-        model_raw = _get_env_value("EMBEDDING_API_MODEL", ("EMBEDDING_MODEL",), "text-embedding-3-small")
-        if model_raw is None:
-            model = "text-embedding-3-small"
-        elif isinstance(model_raw, str):
-            model = model_raw.strip()
-        else:
-            model = str(model_raw)
-        
-        provider_raw = _get_env_value("EMBEDDING_API_PROVIDER", default="openai")
-        if provider_raw is None:
-            provider_value = "openai"
-        elif isinstance(provider_raw, str):
-            provider_value = provider_raw.strip()
-        else:
-            provider_value = str(provider_raw).strip()
-        if not provider_value:
-            provider_value = "openai"
+        if env is None:
+            env = os.environ
+        values = _resolve_env_fields(_EMBEDDING_API_ENV_SPEC, env)
         
-        try:
-            provider = ProviderType(provider_value)
-        except ValueError:
-            logger.warning(
-                f"Unknown provider '{provider_value}', defaulting to 'openai'"
-            )
-            provider = ProviderType.OPENAI
-        
-        dimension_value = os.getenv("EMBEDDING_DIMENSION")
+        dimension_value = env.get("EMBEDDING_DIMENSION")
         if dimension_value is not None:
             dimension_value = dimension_value.strip()
         dimension: Optional[int] = None
@@ -210,19 +305,10 @@ class EmbeddingAPIConfig:
                 dimension = None
         
         if dimension is None:
-            dimension = 3072 if model.endswith("-large") else 1536
+            model = values["model"]
+            dimension = _MODEL_DIMENSIONS.get(model) or (3072 if model.endswith("-large") else 1536)
         
-        return cls(
-            api_key=api_key,
-            base_url=base_url,
-            model=model,
-            provider=provider,
-            dimension=dimension,
-            timeout=int(_get_env_value("EMBEDDING_API_TIMEOUT", default="30") or 30),
-            max_retries=int(_get_env_value("EMBEDDING_API_MAX_RETRIES", default="3") or 3),
-            retry_delay=float(_get_env_value("EMBEDDING_API_RETRY_DELAY", default="1.0") or 1.0),
-            max_retry_delay=float(_get_env_value("EMBEDDING_API_MAX_RETRY_DELAY", default="60.0") or 60.0),
-        )
+        return cls(dimension=dimension, **values)
 
 
 @dataclass
@@ -319,7 +405,7 @@ class BrowserToolConfig:
         )
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class OpenAIConfig:
     """Configuration for OpenAI client wrapper with separate chat and embedding APIs."""
     
@@ -330,25 +416,43 @@ class OpenAIConfig:
     def from_env(cls) -> "OpenAIConfig":
         """Load configuration from environment variables."""
         load_dotenv()
+        env = _snapshot_env()
         return cls(
-            chat_api=ChatAPIConfig.from_env(load_env=False),
-            embedding_api=EmbeddingAPIConfig.from_env(load_env=False),
+            chat_api=ChatAPIConfig.from_env(load_env=False, env=env),
+            embedding_api=EmbeddingAPIConfig.from_env(load_env=False, env=env),
         )
     
     @classmethod
     def from_env_with_fallback(cls) -> "OpenAIConfig":
-        """Load configuration with fallback for embedding API to chat API."""
+        """Load configuration with fallback for embedding API to chat API.
+        
+        Results are memoized per distinct environment snapshot, so the
+        fallback ``logger.info`` messages are emitted once per distinct
+        environment rather than on every call. Use ``_clear_env_cache`` to
+        force a rebuild.
+        """
         load_dotenv()
-        chat_config = ChatAPIConfig.from_env(load_env=False)
+        # Both configs share overlapping legacy keys; read the environment once.
+        env = _snapshot_env()
+        # Configs are immutable, so identical environments can share one instance.
+        cache_key = (cls, tuple(env.items()))
+        cached = _ENV_SNAPSHOT_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        chat_config = ChatAPIConfig.from_env(load_env=False, env=env)
         
         try:
-            embedding_config = EmbeddingAPIConfig.from_env(load_env=False)
+            embedding_config = EmbeddingAPIConfig.from_env(load_env=False, env=env)
+            fallback_fields: Dict[str, Any] = {}
             if embedding_config.api_key is None and chat_config.api_key:
                 logger.info("Embedding API key not set, falling back to chat API key")
-                embedding_config.api_key = chat_config.api_key
+                fallback_fields["api_key"] = chat_config.api_key
             if embedding_config.base_url is None and chat_config.base_url:
                 logger.info("Embedding API base URL not set, falling back to chat API base URL")
-                embedding_config.base_url = chat_config.base_url
+                fallback_fields["base_url"] = chat_config.base_url
+            if fallback_fields:
+                embedding_config = replace(embedding_config, **fallback_fields)
         except Exception as exc:
             logger.warning(
                 "Failed to load embedding API config, falling back to chat API",
@@ -363,24 +467,32 @@ class OpenAIConfig:
                 retry_delay=chat_config.retry_delay,
                 max_retry_delay=chat_config.max_retry_delay,
             )
-            model_override = _get_env_value("EMBEDDING_MODEL")
+            get = env.get
+            override_fields: Dict[str, Any] = {}
+            model_override = get("EMBEDDING_MODEL")
             if model_override is not None:
-                embedding_config.model = model_override
-            dimension_override = _get_env_value("EMBEDDING_DIMENSION")
+                override_fields["model"] = model_override
+            dimension_override = get("EMBEDDING_DIMENSION")
             if dimension_override:
                 try:
-                    embedding_config.dimension = int(dimension_override)
+                    override_fields["dimension"] = int(dimension_override)
                 except ValueError:
                     logger.warning(
                         "Invalid EMBEDDING_DIMENSION '%s', keeping existing value %s",
                         dimension_override,
                         embedding_config.dimension,
                     )
+            if override_fields:
+                embedding_config = replace(embedding_config, **override_fields)
         
-        return cls(
+        config = cls(
             chat_api=chat_config,
             embedding_api=embedding_config,
         )
+        if len(_ENV_SNAPSHOT_CACHE) >= _ENV_SNAPSHOT_CACHE_SIZE:
+            _ENV_SNAPSHOT_CACHE.clear()
+        _ENV_SNAPSHOT_CACHE[cache_key] = config
+        return config
     
     # Legacy properties for backward compatibility
     @property